@@ -0,0 +1,122 @@
+"""Per-tail and per-crew availability timelines.
+
+Every owner (tail number / crew id) keeps its busy time as two sorted, parallel
+lists of merged intervals (starts, ends) in minutes since epoch. Adding an
+interval merges it with whatever it overlaps; "is free at t", "is free over
+[s, e)" and "next free slot of length d after t" are bisections, so generators
+can place maintenance, surge and positioning activities without rescanning
+every leg and crew activity generated so far.
+
+    availability = AvailabilityIndex()
+    availability.add_legs(legs)                      # positioning / grounding legs
+    availability.add_crew_activities(crew_activities)
+    if availability.tails.is_free_between(tail, start, end): ...
+"""
+from bisect import bisect_left, bisect_right
+
+from scenario_common import to_minutes
+
+
+class Timeline:
+    def __init__(self):
+        self._busy = {}     # owner -> (starts, ends)
+
+    def intervals(self, owner) -> list:
+        starts, ends = self._busy.get(owner, ((), ()))
+        return list(zip(starts, ends))
+
+    def add(self, owner, start: int, end: int):
+        """mark [start, end) busy, merging with overlapping / touching intervals."""
+        if end <= start:
+            return
+        starts, ends = self._busy.setdefault(owner, ([], []))
+        i = bisect_left(ends, start)        # first interval ending at/after start
+        j = bisect_right(starts, end)       # intervals starting at/before end
+        if i < j:
+            start = min(start, starts[i])
+            end = max(end, ends[j - 1])
+        starts[i:j] = [start]
+        ends[i:j] = [end]
+
+    def is_free(self, owner, t: int) -> bool:
+        busy = self._busy.get(owner)
+        if busy is None:
+            return True
+        starts, ends = busy
+        i = bisect_right(starts, t) - 1
+        return i < 0 or ends[i] <= t
+
+    def is_free_between(self, owner, start: int, end: int) -> bool:
+        busy = self._busy.get(owner)
+        if busy is None:
+            return True
+        starts, ends = busy
+        i = bisect_right(starts, start) - 1
+        if i >= 0 and ends[i] > start:
+            return False
+        return i + 1 >= len(starts) or starts[i + 1] >= end
+
+    def next_free(self, owner, t: int, duration: int = 0) -> int:
+        """earliest start >= t with `duration` free minutes after it."""
+        busy = self._busy.get(owner)
+        if busy is None:
+            return t
+        starts, ends = busy
+        candidate = t
+        i = bisect_right(starts, t) - 1
+        if i >= 0 and ends[i] > candidate:
+            candidate = ends[i]
+        i += 1
+        while i < len(starts) and starts[i] < candidate + duration:
+            candidate = max(candidate, ends[i])
+            i += 1
+        return candidate
+
+    def busy_until(self, owner, t: int):
+        """end of the busy interval covering t, or None if free at t."""
+        busy = self._busy.get(owner)
+        if busy is None:
+            return None
+        starts, ends = busy
+        i = bisect_right(starts, t) - 1
+        return ends[i] if i >= 0 and ends[i] > t else None
+
+
+class AvailabilityIndex:
+    def __init__(self):
+        self.tails = Timeline()
+        self.crews = Timeline()
+
+    def add_leg(self, leg: dict):
+        start = to_minutes(leg["StartTime"])
+        end = start + leg.get("Duration", 0)
+        self.tails.add(leg["TailNumber"], start, end)
+        for ac in leg.get("AssignedCrewmembers", []):
+            self.crews.add(ac["CrewmemberID"], start, end)
+
+    def add_legs(self, legs: list):
+        for leg in legs:
+            self.add_leg(leg)
+
+    def add_crew_activity(self, act: dict):
+        start = to_minutes(act["StartTime"])
+        self.crews.add(act["CrewmemberID"], start, start + act.get("Duration", 0))
+
+    def add_crew_activities(self, activities: list):
+        for act in activities:
+            self.add_crew_activity(act)
+
+    def add_maintenance(self, req: dict):
+        """maintenance request with a RequiredTail: the tail is busy for ServiceTime."""
+        start = to_minutes(req["RequestedTime"])
+        self.tails.add(req["RequiredTail"], start, start + req.get("ServiceTime", 0))
+
+    @classmethod
+    def from_scenario(cls, scenario: dict) -> "AvailabilityIndex":
+        index = cls()
+        index.add_legs(scenario.get("Legs", []))
+        index.add_crew_activities(scenario.get("CrewActivities", []))
+        for req in scenario.get("FlightRequests", []):
+            if req.get("RequiredTail") is not None:
+                index.add_maintenance(req)
+        return index
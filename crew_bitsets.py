@@ -0,0 +1,170 @@
+"""Crew qualifications as bitmasks over the aircraft-type table.
+
+Each aircraft type gets one bit; every crew has one mask per position
+(PIC / SIC / FA). A request's AllowedTailTypes becomes a mask too, so "can this
+crew fly this request in this position" is a single `crew_mask & request_mask`.
+
+Crews are grouped by mask (a few hundred distinct masks for thousands of
+crews), so building the request -> eligible crews index costs
+O(requests x distinct masks) bit operations, and identical request masks are
+answered from a cache.
+"""
+import json
+
+from scenario_common import crew_qualifications, sidecar_path
+
+POSITIONS = ("PIC", "SIC", "FA")
+ELIGIBILITY_SUFFIX = ".eligibility.json"
+
+
+def build_type_table(type_names) -> dict:
+    """aircraft type name -> bit index, in the given order."""
+    table = {}
+    for name in type_names:
+        if isinstance(name, dict):
+            name = name["AircraftTypeName"]
+        table.setdefault(name, len(table))
+    return table
+
+
+def types_mask(type_names, type_table: dict) -> int:
+    """mask of the given types; types missing from the table get a new bit."""
+    mask = 0
+    for name in type_names:
+        if isinstance(name, dict):
+            name = name["AircraftTypeName"]
+        bit = type_table.get(name)
+        if bit is None:
+            bit = type_table[name] = len(type_table)
+        mask |= 1 << bit
+    return mask
+
+
+def mask_types(mask: int, type_table: dict) -> list:
+    """inverse of types_mask, in table order."""
+    return [name for name, bit in type_table.items() if mask >> bit & 1]
+
+
+def qualification_masks(qualifications: list, type_table: dict) -> dict:
+    """CrewmemberQualifications list -> {"PIC": mask, "SIC": mask, "FA": mask}"""
+    masks = dict.fromkeys(POSITIONS, 0)
+    for q in qualifications:
+        code = q.get("QualificationCode")
+        if code in masks:
+            masks[code] |= types_mask([q["AircraftTypeName"]], type_table)
+    return masks
+
+
+class CrewQualIndex:
+    def __init__(self, type_names=()):
+        self.type_table = build_type_table(type_names)
+        self.crew_masks = {}                                # crew id -> {position: mask}
+        self._groups = {p: {} for p in POSITIONS}           # position -> mask -> [crew ids]
+        self._cache = {}
+
+    def add_crew(self, crew: dict):
+        cid = crew["CrewmemberID"]
+        if cid in self.crew_masks:
+            self.remove_crew(cid)
+        masks = qualification_masks(crew_qualifications(crew), self.type_table)
+        self.crew_masks[cid] = masks
+        for pos, mask in masks.items():
+            if mask:
+                self._groups[pos].setdefault(mask, []).append(cid)
+        self._cache.clear()
+
+    def add_many(self, crews: list):
+        for crew in crews:
+            self.add_crew(crew)
+
+    def remove_crew(self, crew_id):
+        masks = self.crew_masks.pop(crew_id, None)
+        if masks is None:
+            return
+        for pos, mask in masks.items():
+            group = self._groups[pos].get(mask)
+            if group is not None and crew_id in group:
+                group.remove(crew_id)
+                if not group:
+                    del self._groups[pos][mask]
+        self._cache.clear()
+
+    def is_qualified(self, crew_id, position: str, type_mask: int) -> bool:
+        return bool(self.crew_masks[crew_id][position] & type_mask)
+
+    def eligible(self, type_mask: int, position: str) -> tuple:
+        """sorted ids of crews qualified in `position` on any type in type_mask."""
+        key = (type_mask, position)
+        hit = self._cache.get(key)
+        if hit is None:
+            ids = []
+            for crew_mask, group in self._groups[position].items():
+                if crew_mask & type_mask:
+                    ids.extend(group)
+            hit = self._cache[key] = tuple(sorted(ids))
+        return hit
+
+    def request_mask(self, req: dict) -> int:
+        return types_mask(req.get("AllowedTailTypes", []), self.type_table)
+
+    def by_type_position(self) -> dict:
+        """{type: {position: sorted crew ids}} -- one bit's worth of eligible crews."""
+        out = {}
+        for name, bit in self.type_table.items():
+            out[name] = {pos: list(self.eligible(1 << bit, pos)) for pos in POSITIONS}
+        return out
+
+    def eligibility_index(self, requests: list, expand: bool = False) -> dict:
+        """
+        compact form (default):
+            TypeBits        {type: bit}
+            CrewMasks       columnar {CrewmemberID: [...], PIC: [...], SIC: [...], FA: [...]}
+            ByTypePosition  {type: {position: [crew ids]}}
+            Requests        {request id: {TypeMask, Positions}}
+        eligible crews of a request/position = crews whose mask & TypeMask != 0,
+        i.e. the union of ByTypePosition over the request's types.
+
+        expand=True adds Groups ([[crew ids]]) and Requests[id]["Eligible"]
+        ({position: group number}); requests sharing a type mask share a group.
+        """
+        group_ids = {}
+        groups = []
+        by_request = {}
+        for req in requests:
+            positions = [p["PositionInCrew"] for p in req.get("RequiredCrewmemberPositions", [])]
+            if not positions:
+                continue
+            mask = self.request_mask(req)
+            entry = {"TypeMask": mask, "Positions": positions}
+            if expand:
+                entry["Eligible"] = {}
+                for pos in positions:
+                    if pos not in self._groups:
+                        continue
+                    key = (mask, pos)
+                    g = group_ids.get(key)
+                    if g is None:
+                        g = group_ids[key] = len(groups)
+                        groups.append(list(self.eligible(mask, pos)))
+                    entry["Eligible"][pos] = g
+            by_request[req["RequestID"]] = entry
+
+        ids = list(self.crew_masks)
+        index = {
+            "TypeBits": dict(self.type_table),
+            "CrewMasks": {"CrewmemberID": ids,
+                          **{pos: [self.crew_masks[c][pos] for c in ids] for pos in POSITIONS}},
+            "ByTypePosition": self.by_type_position(),
+            "Requests": by_request,
+        }
+        if expand:
+            index["Groups"] = groups
+        return index
+
+
+def write_eligibility_index(index: dict, scenario_filename: str) -> str:
+    """<scenario>.eligibility.json next to the scenario."""
+    path = sidecar_path(scenario_filename, ELIGIBILITY_SUFFIX)
+    with open(path, "w") as f:
+        json.dump(index, f, separators=(",", ":"))
+    return path
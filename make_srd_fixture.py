@@ -0,0 +1,187 @@
+"""Synthetic srd.json fixture for offline / scaling runs.
+
+Writes a schema-compatible StaticRoutingData:
+    Airports:      [{ICAOCode, Latitude, Longitude, CountryID}]
+    RoutingCache:  {Airports: [ICAO], AircraftTypeNames: [...], Routes: [...]}
+
+Airports are clustered around weighted US metro areas (gaussian scatter) with a
+uniform background over the lower 48, plus a share of non-US airports, so
+radius queries see realistic dense / sparse regions. Routes connect the
+busiest airports with a distance-based block time:
+    {OriginAirport, DestinationAirport, AircraftTypeName, Duration (minutes)}
+
+Existing files (the real srd.json included) are only replaced with --force.
+
+usage:
+    python make_srd_fixture.py --airports 20000 --out srd_20000.json
+    SRD_PATH=srd_20000.json python test_doe.py
+    python make_srd_fixture.py --airports 200000 --out srd_big.json --bench
+"""
+import argparse
+import json
+import os
+import random
+import string
+import time
+from math import atan2, cos, radians, sin, sqrt
+
+from route_table import block_minutes
+
+# (lat, lon, weight): rough US business-aviation metros; the 3 DOE hubs come first
+US_METROS = [
+    (40.85, -74.06, 10), (26.68, -80.10, 7), (38.95, -77.46, 7),
+    (41.88, -87.63, 6), (34.05, -118.24, 8), (32.78, -96.80, 6), (29.76, -95.37, 5),
+    (33.75, -84.39, 5), (25.76, -80.19, 6), (37.77, -122.42, 5), (47.61, -122.33, 3),
+    (39.74, -104.99, 4), (33.45, -112.07, 4), (42.36, -71.06, 4), (44.98, -93.27, 3),
+    (36.17, -115.14, 4), (28.54, -81.38, 4), (35.23, -80.84, 3), (39.96, -82.99, 3),
+    (36.16, -86.78, 3), (30.27, -97.74, 3), (29.42, -98.49, 2), (32.72, -117.16, 3),
+    (45.52, -122.68, 2), (40.76, -111.89, 2), (38.63, -90.20, 2), (39.10, -94.58, 2),
+    (27.95, -82.46, 3), (35.47, -97.52, 2), (43.04, -87.91, 2), (42.33, -83.05, 3),
+    (40.44, -79.99, 2), (39.29, -76.61, 2), (35.78, -78.64, 2), (32.08, -81.09, 2),
+]
+US_BOUNDS = (25.0, 49.0, -124.5, -67.0)
+# (country, lat, lon, spread)
+OTHER_REGIONS = [("CA", 45.5, -75.0, 4.0), ("MX", 21.0, -100.0, 5.0), ("BS", 25.0, -77.4, 1.0),
+                 ("GB", 52.0, -1.0, 2.0), ("FR", 47.0, 2.0, 2.5)]
+
+AIRCRAFT_TYPES = ["CL-650S", "CE-700", "CL-350S", "CE-680AS", "EMB-545-MOD", "GL5000S", "CE-680",
+                  "CE-560XLS", "EMB-505S", "EMB-505E", "GL6000S", "GL7500", "GL5500"]
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    R = 3958.8  # earth radius (miles)
+    dlat = radians(lat2 - lat1)
+    dlon = radians(lon2 - lon1)
+    a = sin(dlat / 2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2)**2
+    return R * 2 * atan2(sqrt(a), sqrt(1 - a))
+
+
+def _icao_codes(rng: random.Random, n: int):
+    """unique codes: K??? first (like ICAO), then FAA-style local ids (1N7, 15NJ, ...)."""
+    letters = string.ascii_uppercase
+    alnum = string.ascii_uppercase + string.digits
+    k_codes = ["K" + a + b + c for a in letters for b in letters for c in letters]
+    rng.shuffle(k_codes)
+    seen = set()
+    for code in k_codes[:n]:
+        seen.add(code)
+        yield code
+    produced = min(n, len(k_codes))
+    while produced < n:
+        length = rng.choice((3, 4))
+        code = rng.choice(string.digits) + "".join(rng.choice(alnum) for _ in range(length - 1))
+        if code in seen:
+            continue
+        seen.add(code)
+        produced += 1
+        yield code
+
+
+def _us_point(rng: random.Random, metro_weights, cluster_share: float):
+    lat_lo, lat_hi, lon_lo, lon_hi = US_BOUNDS
+    if rng.random() < cluster_share:
+        lat, lon, _ = rng.choices(US_METROS, weights=metro_weights)[0]
+        spread = rng.choice((0.15, 0.4, 1.0))       # dense core, suburbs, region
+        return (min(max(rng.gauss(lat, spread), lat_lo), lat_hi),
+                min(max(rng.gauss(lon, spread * 1.3), lon_lo), lon_hi))
+    return rng.uniform(lat_lo, lat_hi), rng.uniform(lon_lo, lon_hi)
+
+
+def build_srd(num_airports: int = 5000, seed: int = 0, cluster_share: float = 0.7,
+              non_us_share: float = 0.05, missing_coords_share: float = 0.0,
+              num_routes: int = 2000) -> dict:
+    """StaticRoutingData dict with num_airports airports."""
+    if not 1 <= num_airports <= 250_000:
+        raise ValueError(f"Invalid num_airports: {num_airports}")
+    rng = random.Random(seed)
+    metro_weights = [w for _, _, w in US_METROS]
+    airports = []
+    for code in _icao_codes(rng, num_airports):
+        if rng.random() < non_us_share:
+            country, clat, clon, spread = rng.choice(OTHER_REGIONS)
+            lat, lon = rng.gauss(clat, spread), rng.gauss(clon, spread)
+        else:
+            country = "US"
+            lat, lon = _us_point(rng, metro_weights, cluster_share)
+        a = {"ICAOCode": code, "CountryID": country}
+        if rng.random() >= missing_coords_share:
+            a["Latitude"] = round(lat, 5)
+            a["Longitude"] = round(lon, 5)
+        airports.append(a)
+
+    # routes between a pool of "busy" airports (the first ones with coordinates)
+    with_coords = [a for a in airports if "Latitude" in a]
+    pool = with_coords[:max(2, min(len(with_coords), int(sqrt(num_routes) * 2)))]
+    routes = []
+    seen = set()
+    tries = 0
+    while len(routes) < num_routes and len(pool) > 1 and tries < num_routes * 10:
+        tries += 1
+        o, d = rng.sample(pool, 2)
+        t = rng.choice(AIRCRAFT_TYPES)
+        if (o["ICAOCode"], d["ICAOCode"], t) in seen:
+            continue
+        seen.add((o["ICAOCode"], d["ICAOCode"], t))
+        dist = haversine(o["Latitude"], o["Longitude"], d["Latitude"], d["Longitude"])
+        routes.append({"OriginAirport": o["ICAOCode"], "DestinationAirport": d["ICAOCode"],
+                       "AircraftTypeName": t, "Duration": block_minutes(dist, t)})
+
+    return {"StaticRoutingData": {
+        "Airports": airports,
+        "RoutingCache": {
+            "Airports": [a["ICAOCode"] for a in airports],
+            "AircraftTypeNames": list(AIRCRAFT_TYPES),
+            "Routes": routes,
+        },
+    }}
+
+
+def write_srd(path: str, **kwargs) -> str:
+    data = build_srd(**kwargs)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    return path
+
+
+def bench(srd_path: str, radius_queries: int = 50, seed: int = 0):
+    """time the generator's geo code and one scenario on the fixture (imports test_doe with SRD_PATH)."""
+    os.environ["SRD_PATH"] = srd_path
+    t0 = time.perf_counter()
+    import test_doe
+    t_load = time.perf_counter() - t0
+
+    rng = random.Random(seed)
+    centers = rng.sample(test_doe.us_airports, min(radius_queries, len(test_doe.us_airports)))
+    t0 = time.perf_counter()
+    hits = sum(len(test_doe.airports_inside_circle(c, 30.0, test_doe.us_airports_dict)) for c in centers)
+    t_radius = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    test_doe.generate_scenario(seed=seed, weather=True, event=True, geo_density="high")
+    t_scenario = time.perf_counter() - t0
+    print(f"[+] load srd: {t_load:.2f}s | {len(centers)} radius queries: {t_radius:.2f}s "
+          f"({hits / max(len(centers), 1):.0f} airports/query) | generate_scenario: {t_scenario:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="write a synthetic srd.json")
+    parser.add_argument("--airports", type=int, default=5000, help="number of airports (500 - 200k)")
+    parser.add_argument("--routes", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cluster-share", type=float, default=0.7, help="share of US airports around metros")
+    parser.add_argument("--non-us-share", type=float, default=0.05)
+    parser.add_argument("--missing-coords-share", type=float, default=0.0)
+    parser.add_argument("--out", default="srd_fixture.json")
+    parser.add_argument("--force", action="store_true", help="overwrite --out if it exists")
+    parser.add_argument("--bench", action="store_true", help="time radius queries and one scenario on it")
+    args = parser.parse_args()
+    if os.path.exists(args.out) and not args.force:
+        parser.error(f"{args.out} exists; pass --force to overwrite it")
+
+    t0 = time.perf_counter()
+    write_srd(args.out, num_airports=args.airports, seed=args.seed, cluster_share=args.cluster_share,
+              non_us_share=args.non_us_share, missing_coords_share=args.missing_coords_share,
+              num_routes=args.routes)
+    print(f"✅ {args.out}: {args.airports} airports, {args.routes} routes ({time.perf_counter() - t0:.1f}s)")
+    if args.bench:
+        bench(args.out)
@@ -0,0 +1,134 @@
+"""Indexed RoutingCache route lookup.
+
+RouteTable hashes srd.json's RoutingCache["Routes"] on (origin, destination,
+aircraft type) -> block minutes. Pairs without a route fall back to a
+great-circle distance / cruise-speed estimate computed from coordinates that
+are converted to radians once up front, and estimates are memoized, so a
+lookup is one dict hit in the common case.
+
+Routes may come as dicts (OriginAirport/DestinationAirport/AircraftTypeName/
+Duration, or the usual aliases) or as [origin, destination, type, minutes]
+rows, with airports / types either as codes or as indexes into
+RoutingCache["Airports"] / ["AircraftTypeNames"].
+"""
+import json
+from math import asin, cos, radians, sin, sqrt
+
+EARTH_RADIUS_MILES = 3958.8
+TAXI_MINUTES = 20           # taxi / climb / descent allowance on top of cruise time
+DEFAULT_CRUISE_MPH = 500
+CRUISE_MPH = {"CL-650S": 530, "CE-700": 530, "CL-350S": 500, "CE-680AS": 500, "EMB-545-MOD": 500,
+              "GL5000S": 540, "CE-680": 490, "CE-560XLS": 460, "EMB-505S": 440, "EMB-505E": 440,
+              "GL6000S": 540, "GL7500": 560, "GL5500": 540}
+
+_ORIGIN_KEYS = ("OriginAirport", "DepartureAirport", "Origin", "FromAirport", "From")
+_DEST_KEYS = ("DestinationAirport", "ArrivalAirport", "Destination", "ToAirport", "To")
+_TYPE_KEYS = ("AircraftTypeName", "AircraftType", "TailType")
+_MINUTES_KEYS = ("Duration", "BlockTime", "FlightTime", "FlightTimeMinutes", "Minutes")
+
+
+def block_minutes(distance_miles: float, aircraft_type: str) -> int:
+    """taxi allowance + cruise time, rounded to 5 minutes."""
+    minutes = TAXI_MINUTES + distance_miles / CRUISE_MPH.get(aircraft_type, DEFAULT_CRUISE_MPH) * 60
+    return int(round(minutes / 5.0)) * 5
+
+
+def load_airport_coords(srd_path: str = "srd.json") -> dict:
+    """ICAO -> (lat, lon) for every srd.json airport with coordinates."""
+    with open(srd_path, "r", encoding="utf-8") as f:
+        srd = json.load(f)["StaticRoutingData"]
+    return {a["ICAOCode"]: (a["Latitude"], a["Longitude"])
+            for a in srd["Airports"] if "Latitude" in a and "Longitude" in a}
+
+
+def _first(rec: dict, keys):
+    for k in keys:
+        if k in rec:
+            return rec[k]
+    return None
+
+
+class RouteTable:
+    def __init__(self, routes=(), airport_coords: dict = None, airport_names=None, aircraft_names=None):
+        """
+        routes:          RoutingCache["Routes"]
+        airport_coords:  ICAO -> (lat, lon), for the fallback estimate
+        airport_names / aircraft_names: RoutingCache["Airports"] / ["AircraftTypeNames"],
+                         only needed when routes refer to them by index
+        """
+        self.routes = {}
+        self._airport_names = list(airport_names or [])
+        self._aircraft_names = list(aircraft_names or [])
+        self._rad = {}      # ICAO -> (lat rad, lon rad, cos lat)
+        self._estimates = {}
+        self.skipped_routes = 0
+        self.stats = {"route_hits": 0, "estimates": 0, "unknown": 0}
+        if airport_coords:
+            self.add_coords(airport_coords)
+        for r in routes:
+            self.add_route(r)
+
+    def add_coords(self, airport_coords: dict):
+        for icao, (lat, lon) in airport_coords.items():
+            la = radians(lat)
+            self._rad[icao] = (la, radians(lon), cos(la))
+
+    def _name(self, value, names):
+        if isinstance(value, int) and not isinstance(value, bool) and 0 <= value < len(names):
+            return names[value]
+        return value
+
+    def add_route(self, route):
+        if isinstance(route, dict):
+            o, d = _first(route, _ORIGIN_KEYS), _first(route, _DEST_KEYS)
+            t, minutes = _first(route, _TYPE_KEYS), _first(route, _MINUTES_KEYS)
+        elif isinstance(route, (list, tuple)) and len(route) >= 4:
+            o, d, t, minutes = route[:4]
+        else:
+            o = None
+        if o is None or d is None or minutes is None:
+            self.skipped_routes += 1
+            return
+        o = self._name(o, self._airport_names)
+        d = self._name(d, self._airport_names)
+        t = self._name(t, self._aircraft_names)
+        self.routes[(o, d, t)] = int(minutes)
+
+    def distance_miles(self, origin: str, destination: str):
+        a, b = self._rad.get(origin), self._rad.get(destination)
+        if a is None or b is None:
+            return None
+        # haversine on precomputed radians / cosines
+        h = sin((b[0] - a[0]) / 2) ** 2 + a[2] * b[2] * sin((b[1] - a[1]) / 2) ** 2
+        return 2 * EARTH_RADIUS_MILES * asin(min(1.0, sqrt(h)))
+
+    def within(self, center: str, radius_miles: float) -> set:
+        """airports with coordinates within radius_miles of center (center included)."""
+        if center not in self._rad:
+            return set()
+        return {icao for icao in self._rad if self.distance_miles(center, icao) <= radius_miles}
+
+    def block_time(self, origin: str, destination: str, aircraft_type: str = None, default: int = 120) -> int:
+        """block minutes from the RoutingCache, else the distance/speed estimate, else `default`."""
+        key = (origin, destination, aircraft_type)
+        minutes = self.routes.get(key)
+        if minutes is not None:
+            self.stats["route_hits"] += 1
+            return minutes
+        minutes = self._estimates.get(key)
+        if minutes is None:
+            dist = self.distance_miles(origin, destination)
+            if dist is None:
+                self.stats["unknown"] += 1
+                return default
+            minutes = self._estimates[key] = block_minutes(dist, aircraft_type)
+        self.stats["estimates"] += 1
+        return minutes
+
+    def block_times(self, legs, aircraft_type: str = None, default: int = 120) -> list:
+        """batch form: [(origin, destination[, type]), ...] -> [minutes, ...]"""
+        out = []
+        for leg in legs:
+            t = leg[2] if len(leg) > 2 else aircraft_type
+            out.append(self.block_time(leg[0], leg[1], t, default))
+        return out
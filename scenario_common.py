@@ -0,0 +1,90 @@
+"""Shared helpers for the scenario tools (validator, reader, diff, ...).
+
+Kept free of the srd.json loading that happens at import time in test_doe.py,
+so the tools can be used on scenario files alone.
+"""
+import gzip
+import json
+from datetime import datetime, timedelta
+
+try:
+    import zstandard
+except ImportError:     # optional, only needed for .zst scenarios
+    zstandard = None
+
+TIME_FMT = "%Y-%m-%dT%H:%M:%SZ"
+EPOCH = datetime(1970, 1, 1)
+
+# natural id of the records in each list section of a scenario
+SECTION_KEYS = {
+    "Tails": "TailNumber",
+    "FlightRequests": "RequestID",
+    "Crewmembers": "CrewmemberID",
+    "Legs": "LegID",
+}
+
+LIST_SECTIONS = ["Tails", "FlightRequests", "Legs", "Crewmembers",
+                 "CrewActivities", "CrewFlyingTogether"]
+
+# older scenario files (e.g. scenario11_full_with_crew.json) use QualifiedAircraftTypes
+QUALIFICATION_KEYS = ("CrewmemberQualifications", "QualifiedAircraftTypes")
+
+
+_minutes_cache = {}
+
+def to_minutes(ts: str) -> int:
+    """'2025-04-01T06:00:00Z' -> minutes since 1970-01-01 (cached, no strptime)."""
+    m = _minutes_cache.get(ts)
+    if m is None:
+        dt = datetime(int(ts[0:4]), int(ts[5:7]), int(ts[8:10]),
+                      int(ts[11:13]), int(ts[14:16]), int(ts[17:19]))
+        m = int((dt - EPOCH).total_seconds()) // 60
+        if len(_minutes_cache) < 1_000_000:
+            _minutes_cache[ts] = m
+    return m
+
+
+def from_minutes(minutes: int) -> str:
+    """inverse of to_minutes."""
+    return (EPOCH + timedelta(minutes=minutes)).strftime(TIME_FMT)
+
+
+def crew_qualifications(crew: dict) -> list:
+    for key in QUALIFICATION_KEYS:
+        if key in crew:
+            return crew[key]
+    return []
+
+
+def activity_key(act: dict) -> tuple:
+    """natural key of a crew activity: (crew, type, start, leg)."""
+    return (act.get("CrewmemberID"), act.get("ActivityType"),
+            act.get("StartTime"), act.get("LegID"))
+
+
+def open_scenario_file(path: str):
+    """binary file object for a plain, .gz or .zst scenario file."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{path}: reading .zst scenarios needs the zstandard package")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return open(path, "rb")
+
+
+def sidecar_path(scenario_filename: str, suffix: str) -> str:
+    """<scenario><suffix> next to a plain, .gz or .zst scenario file (extensions stripped)."""
+    base = scenario_filename
+    for ext in (".gz", ".zst", ".json"):
+        if base.endswith(ext):
+            base = base[:-len(ext)]
+    return base + suffix
+
+
+def load_scenario(scenario_or_path):
+    """accept an in-memory scenario dict or a path to a (possibly compressed) scenario json file."""
+    if isinstance(scenario_or_path, dict):
+        return scenario_or_path
+    with open_scenario_file(scenario_or_path) as f:
+        return json.load(f)
@@ -0,0 +1,153 @@
+"""Structural diff between two scenario files.
+
+Records are matched on their natural ids (TailNumber, RequestID, CrewmemberID,
+LegID, the (crew, type, start, leg) tuple for CrewActivities and the member
+set for CrewFlyingTogether), so each section is diffed with two hash maps in
+linear time. Sections are read one at a time through scenario_reader, so only
+one section of each file is in memory.
+
+usage:
+    python scenario_diff.py old.json new.json [--json] [--limit 20]
+"""
+import argparse
+import hashlib
+import json
+
+from scenario_common import SECTION_KEYS, activity_key
+from scenario_reader import list_sections, read_section
+
+
+def record_key(section: str, rec):
+    if section in SECTION_KEYS:
+        return rec.get(SECTION_KEYS[section])
+    if section == "CrewActivities":
+        return activity_key(rec)
+    if section == "CrewFlyingTogether":
+        return tuple(sorted(rec.get("Crewmembers", [])))
+    return None
+
+
+def record_hash(rec) -> str:
+    return hashlib.blake2b(json.dumps(rec, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+
+def keyed(section: str, records: list) -> dict:
+    """key -> record. Repeated keys get an occurrence number so nothing is lost."""
+    out = {}
+    seen = {}
+    for rec in records:
+        key = record_key(section, rec)
+        if key is None:     # section without a natural id: fall back to the content hash
+            key = record_hash(rec)
+        n = seen.get(key, 0)
+        seen[key] = n + 1
+        out[key if n == 0 else (key, n)] = rec
+    return out
+
+
+def field_changes(old, new, prefix: str = "") -> list:
+    """[{field, old, new}] for differing fields; nested dicts are walked, lists compared whole."""
+    if not (isinstance(old, dict) and isinstance(new, dict)):
+        return [] if old == new else [{"field": prefix or "<value>", "old": old, "new": new}]
+    changes = []
+    for field in old.keys() | new.keys():
+        a, b = old.get(field), new.get(field)
+        if a == b and (field in old) == (field in new):
+            continue
+        path = f"{prefix}.{field}" if prefix else field
+        if isinstance(a, dict) and isinstance(b, dict):
+            changes.extend(field_changes(a, b, path))
+        else:
+            changes.append({"field": path, "old": a, "new": b})
+    changes.sort(key=lambda c: c["field"])
+    return changes
+
+
+def diff_records(section: str, old_records: list, new_records: list) -> dict:
+    old_by_key = keyed(section, old_records)
+    new_by_key = keyed(section, new_records)
+
+    added = [k for k in new_by_key if k not in old_by_key]
+    removed = [k for k in old_by_key if k not in new_by_key]
+    modified = []
+    unchanged = 0
+    for key, old in old_by_key.items():
+        new = new_by_key.get(key)
+        if new is None:
+            continue
+        if old == new:
+            unchanged += 1
+        else:
+            modified.append({"key": key, "changes": field_changes(old, new)})
+    return {"added": added, "removed": removed, "modified": modified, "unchanged": unchanged}
+
+
+def diff_scenarios(old, new) -> dict:
+    """
+    old / new: paths or in-memory scenario dicts.
+    Returns {section: {added, removed, modified, unchanged}} for list sections
+    and {section: {modified: [field changes]}} for the others.
+    """
+    def sections(s):
+        return list(s.keys()) if isinstance(s, dict) else list(list_sections(s))
+
+    def get(s, name):
+        if isinstance(s, dict):
+            return s.get(name)
+        return read_section(s, name)
+
+    old_names, new_names = sections(old), sections(new)
+    names = old_names + [n for n in new_names if n not in old_names]
+    result = {}
+    for name in names:
+        a = get(old, name) if name in old_names else None
+        b = get(new, name) if name in new_names else None
+        if isinstance(a, list) or isinstance(b, list):
+            result[name] = diff_records(name, a or [], b or [])
+        else:
+            result[name] = {"modified": field_changes(a, b)}
+    return result
+
+
+def _jsonable(obj):
+    if isinstance(obj, tuple):
+        return [_jsonable(x) for x in obj]
+    if isinstance(obj, list):
+        return [_jsonable(x) for x in obj]
+    if isinstance(obj, dict):
+        return {k: _jsonable(v) for k, v in obj.items()}
+    return obj
+
+
+def is_identical(diff: dict) -> bool:
+    return all(not d.get("added") and not d.get("removed") and not d.get("modified")
+               for d in diff.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="structural diff of two scenario json files")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--json", action="store_true", help="print the full diff as json")
+    parser.add_argument("--limit", type=int, default=10, help="entries shown per section and kind")
+    args = parser.parse_args()
+
+    diff = diff_scenarios(args.old, args.new)
+    if args.json:
+        print(json.dumps(_jsonable(diff), indent=2))
+    else:
+        for name, d in diff.items():
+            if "added" not in d:
+                for c in d["modified"][:args.limit]:
+                    print(f"~ {name}.{c['field']}: {c['old']!r} -> {c['new']!r}")
+                continue
+            print(f"[{name}] +{len(d['added'])} -{len(d['removed'])} ~{len(d['modified'])} ={d['unchanged']}")
+            for k in d["added"][:args.limit]:
+                print(f"  + {k}")
+            for k in d["removed"][:args.limit]:
+                print(f"  - {k}")
+            for m in d["modified"][:args.limit]:
+                fields = ", ".join(c["field"] for c in m["changes"])
+                print(f"  ~ {m['key']}: {fields}")
+        if is_identical(diff):
+            print("✅ identical")
@@ -0,0 +1,244 @@
+"""Feasibility-driven hardness metrics for a scenario, cheap enough to run right
+after generate_scenario and filter / stratify DOE cells before solving.
+
+Per request:
+    NearbyTails     tails of an allowed type within radius_miles of the departure
+                    airport that can be there by RequestedTime (AvailableTime, busy
+                    legs / maintenance and the positioning block time included)
+    CrewsOnTour     per required position: crews qualified on an allowed type
+                    whose tour covers the requested time
+    CrewBottleneck  min of CrewsOnTour over the positions
+    WeatherAirport  departure or arrival airport is weather-affected
+Per scenario: the distributions of these, the share of requests with no
+feasible tail / crew, and requests per un-grounded tail (weather capacity).
+
+The joins are done on grouped columns rather than per request x per record:
+tails are bucketed by airport and the airports by 1-degree grid cell, so each
+distinct departure airport collects its candidate tails once; crews are
+grouped by qualification mask (CrewQualIndex), and per (type mask, position)
+group the tour starts / ends are sorted, so "on tour at t" is two bisections.
+
+    metrics = analyze_scenario(scenario, airport_coords, radius_miles=100)
+    write_hardness(metrics, "scenario_....json")    # -> scenario_....hardness.json
+"""
+import json
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from math import cos, floor, radians
+
+from availability_timeline import AvailabilityIndex
+from crew_bitsets import POSITIONS, CrewQualIndex, types_mask
+from route_table import RouteTable
+from scenario_common import load_scenario, sidecar_path, to_minutes
+
+HARDNESS_SUFFIX = ".hardness.json"
+GRID_DEGREES = 1.0
+MILES_PER_DEGREE = 69.0
+GROUNDING_TYPES = ("WEATHER_GROUNDED", "AOG")
+
+
+def hardness_path(scenario_filename: str) -> str:
+    return sidecar_path(scenario_filename, HARDNESS_SUFFIX)
+
+
+def _quantiles(values: list) -> dict:
+    if not values:
+        return {"Min": None, "P10": None, "Median": None, "Mean": None, "Max": None}
+    v = sorted(values)
+    at = lambda q: v[min(len(v) - 1, int(q * len(v)))]
+    return {"Min": v[0], "P10": at(0.1), "Median": at(0.5), "Mean": round(sum(v) / len(v), 2), "Max": v[-1]}
+
+
+class _Grid:
+    """airports bucketed by lat/lon cell, for radius queries that skip far cells."""
+
+    def __init__(self, airport_coords: dict):
+        self.coords = airport_coords
+        self.cells = defaultdict(list)
+        for icao, (lat, lon) in airport_coords.items():
+            self.cells[(floor(lat / GRID_DEGREES), floor(lon / GRID_DEGREES))].append(icao)
+
+    def candidates(self, icao: str, radius_miles: float) -> list:
+        lat, lon = self.coords[icao]
+        dlat = int(radius_miles / (MILES_PER_DEGREE * GRID_DEGREES)) + 1
+        dlon = int(radius_miles / (MILES_PER_DEGREE * GRID_DEGREES * max(cos(radians(lat)), 0.05))) + 1
+        ci, cj = floor(lat / GRID_DEGREES), floor(lon / GRID_DEGREES)
+        out = []
+        for i in range(ci - dlat, ci + dlat + 1):
+            for j in range(cj - dlon, cj + dlon + 1):
+                out.extend(self.cells.get((i, j), ()))
+        return out
+
+
+class HardnessAnalyzer:
+    def __init__(self, scenario, airport_coords: dict, radius_miles: float = 100.0,
+                 route_table: RouteTable = None):
+        """
+        airport_coords:  ICAO -> (lat, lon)
+        route_table:     block times for positioning (default: distance estimate only)
+        """
+        self.scenario = load_scenario(scenario)
+        self.radius_miles = radius_miles
+        self.grid = _Grid(airport_coords)
+        self.routes = route_table or RouteTable(airport_coords=airport_coords)
+        self.availability = AvailabilityIndex.from_scenario(self.scenario)
+        s = self.scenario
+
+        tail_types = sorted({t["AircraftTypeName"] for t in s.get("Tails", [])})
+        self.quals = CrewQualIndex(tail_types)
+        self.quals.add_many(s.get("Crewmembers", []))
+
+        # tails grouped by location: (tail number, type bit, type, ready minute)
+        self.tails_at = defaultdict(list)
+        for t in s.get("Tails", []):
+            bit = types_mask([t["AircraftTypeName"]], self.quals.type_table)
+            ready = to_minutes(t["AvailableTime"]) if t.get("AvailableTime") else 0
+            self.tails_at[t.get("CurrentLocation")].append((t["TailNumber"], bit, t["AircraftTypeName"], ready))
+
+        self.crew_tours = {c["CrewmemberID"]: (to_minutes(c["tourStartDate"]) if c.get("tourStartDate") else None,
+                                               to_minutes(c["tourEndDate"]) if c.get("tourEndDate") else None)
+                           for c in s.get("Crewmembers", [])}
+        weather = s.get("Weather") or {}
+        self.weather_airports = set(weather.get("AffectedAirports", [])) if weather.get("Enabled") else set()
+        self.grounded_tails = {l["TailNumber"] for l in s.get("Legs", [])
+                               if l.get("IsLocked") and l.get("mxType") in GROUNDING_TYPES}
+        self._nearby = {}
+        self._tours = {}
+
+    # === joins ===
+    def nearby_tails(self, icao: str) -> list:
+        """[(tail, type bit, type, ready minute, origin)] within radius of icao (cached per airport)."""
+        hit = self._nearby.get(icao)
+        if hit is None:
+            hit = []
+            if icao in self.grid.coords:
+                for other in self.grid.candidates(icao, self.radius_miles):
+                    tails = self.tails_at.get(other)
+                    if tails and self.routes.distance_miles(other, icao) <= self.radius_miles:
+                        hit.extend(t + (other,) for t in tails)
+            else:       # no coordinates: only tails already at the airport
+                hit = [t + (icao,) for t in self.tails_at.get(icao, ())]
+            self._nearby[icao] = hit
+        return hit
+
+    def _tour_columns(self, type_mask: int, position: str):
+        """sorted tour starts / ends of the crews qualified for (type_mask, position)."""
+        key = (type_mask, position)
+        hit = self._tours.get(key)
+        if hit is None:
+            starts, ends = [], []
+            for cid in self.quals.eligible(type_mask, position):
+                start, end = self.crew_tours.get(cid, (None, None))
+                starts.append(start if start is not None else float("-inf"))
+                ends.append(end if end is not None else float("inf"))
+            hit = self._tours[key] = (sorted(starts), sorted(ends))
+        return hit
+
+    def crews_on_tour(self, type_mask: int, position: str, t: int) -> int:
+        starts, ends = self._tour_columns(type_mask, position)
+        # started by t, minus those whose tour already ended before t
+        return bisect_right(starts, t) - bisect_left(ends, t)
+
+    def feasible_tails(self, req: dict, type_mask: int, t: int) -> int:
+        dep = req["DepartureAirport"]
+        tails = self.availability.tails
+        n = 0
+        for tail, bit, type_name, ready, origin in self.nearby_tails(dep):
+            if not bit & type_mask:
+                continue
+            block = 0 if origin == dep else self.routes.block_time(origin, dep, type_name)
+            start = tails.next_free(tail, ready, block)
+            if start + block <= t and tails.is_free(tail, t):
+                n += 1
+        return n
+
+    # === metrics ===
+    def analyze(self) -> dict:
+        ids, nearby, bottleneck, weather_flags = [], [], [], []
+        on_tour = {p: [] for p in POSITIONS}
+        n_flight = 0
+        for req in self.scenario.get("FlightRequests", []):
+            if req.get("ActivityType") == "MAINTENANCE":
+                continue
+            n_flight += 1
+            t = to_minutes(req["RequestedTime"])
+            mask = self.quals.request_mask(req)
+            positions = [p["PositionInCrew"] for p in req.get("RequiredCrewmemberPositions", [])]
+            counts = {p: self.crews_on_tour(mask, p, t) for p in set(positions) if p in on_tour}
+            ids.append(req["RequestID"])
+            nearby.append(self.feasible_tails(req, mask, t))
+            for p in POSITIONS:
+                on_tour[p].append(counts.get(p))
+            bottleneck.append(min(counts.values()) if counts else None)
+            weather_flags.append(req["DepartureAirport"] in self.weather_airports
+                                 or req["ArrivalAirport"] in self.weather_airports)
+
+        n_tails = len(self.scenario.get("Tails", []))
+        flying = n_tails - len(self.grounded_tails)
+        crew_counts = [b for b in bottleneck if b is not None]
+        summary = {
+            "FlightRequests": n_flight,
+            "NearbyTails": _quantiles(nearby),
+            "NoFeasibleTailShare": round(sum(1 for n in nearby if n == 0) / n_flight, 4) if n_flight else None,
+            "CrewBottleneck": _quantiles(crew_counts),
+            "NoCrewShare": round(sum(1 for b in crew_counts if b == 0) / len(crew_counts), 4) if crew_counts else None,
+            "Weather": {
+                "GroundedTails": len(self.grounded_tails),
+                "Tails": n_tails,
+                "GroundedShare": round(len(self.grounded_tails) / n_tails, 4) if n_tails else None,
+                # requests per tail still able to fly
+                "RequestsPerAvailableTail": round(n_flight / flying, 3) if flying > 0 else None,
+                "RequestsTouchingWeather": sum(weather_flags),
+            },
+        }
+        return {
+            "Parameters": {"RadiusMiles": self.radius_miles},
+            "Summary": summary,
+            # columnar, one entry per flight request
+            "Requests": {
+                "RequestID": ids,
+                "NearbyTails": nearby,
+                "CrewsOnTour": {p: v for p, v in on_tour.items() if any(x is not None for x in v)},
+                "CrewBottleneck": bottleneck,
+                "WeatherAirport": weather_flags,
+            },
+        }
+
+
+def analyze_scenario(scenario, airport_coords: dict, radius_miles: float = 100.0,
+                     route_table: RouteTable = None) -> dict:
+    return HardnessAnalyzer(scenario, airport_coords, radius_miles, route_table).analyze()
+
+
+def write_hardness(metrics: dict, scenario_filename: str) -> str:
+    """<scenario>.hardness.json next to the scenario."""
+    path = hardness_path(scenario_filename)
+    with open(path, "w") as f:
+        json.dump(metrics, f, separators=(",", ":"))
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="write <scenario>.hardness.json")
+    parser.add_argument("scenarios", nargs="+")
+    parser.add_argument("--srd", default="srd.json")
+    parser.add_argument("--radius", type=float, default=100.0, help="miles around the departure airport")
+    args = parser.parse_args()
+
+    with open(args.srd, "r", encoding="utf-8") as f:
+        srd = json.load(f)["StaticRoutingData"]
+    routing = srd["RoutingCache"]
+    coords = {a["ICAOCode"]: (a["Latitude"], a["Longitude"])
+              for a in srd["Airports"] if "Latitude" in a and "Longitude" in a}
+    table = RouteTable(routing.get("Routes", []), coords, routing.get("Airports"), routing.get("AircraftTypeNames"))
+    for path in args.scenarios:
+        t0 = time.perf_counter()
+        metrics = analyze_scenario(path, coords, args.radius, table)
+        out = write_hardness(metrics, path)
+        s = metrics["Summary"]
+        print(f"✅ {out} ({time.perf_counter() - t0:.2f}s): median tails {s['NearbyTails']['Median']}, "
+              f"no-tail share {s['NoFeasibleTailShare']}, median crew bottleneck {s['CrewBottleneck']['Median']}, "
+              f"requests/available tail {s['Weather']['RequestsPerAvailableTail']}")
@@ -0,0 +1,442 @@
+"""Inject disruptions into an existing scenario without regenerating it.
+
+The scenario is loaded once into id -> record indexes (tails by number and by
+location, crews, crew activities / legs / CrewFlyingTogether pairs by crew),
+so each operator only touches the records it changes:
+
+    weather(...)            ground every tail at the affected airports (locked WEATHER_GROUNDED legs)
+    aircraft_on_ground(...) locked AOG leg for the given tails
+                            (grounding drops the tail's unlocked legs in that time and
+                            their crew activities; time already locked is left as is)
+    crew_sick(...)          end the crews' tours, drop their later activities / leg
+                            assignments and their CrewFlyingTogether pairs
+    late_requests(...)      new flight requests that show up after the window opened
+
+Removed records are only marked; the section lists are rebuilt once in
+result(). Every change is also recorded in a compact delta (per operation:
+added records, removed ids, modified fields), written next to the output as
+<scenario>.delta.json.
+
+    p = ScenarioPerturber("scenario11_full_with_crew.json", airport_coords=load_airport_coords())
+    p.weather("KTEB", radius_miles=30)
+    p.aircraft_on_ground(["1000001", "1000002"], duration_minutes=12 * 60)
+    p.crew_sick([700001])
+    p.late_requests(50, seed=1)
+    p.write("scenario11_disrupted.json")
+
+check_operators() (CLI: --check) runs each operator once on a copy of a
+scenario and reports validator errors the original does not already have.
+"""
+import json
+import random
+from collections import defaultdict
+
+from route_table import RouteTable, load_airport_coords
+from scenario_common import SECTION_KEYS, from_minutes, load_scenario, sidecar_path, to_minutes
+from scenario_validator import ERROR, validate_scenario
+from scenario_writer import output_path, write_scenario
+
+DEFAULT_LEG_ID = 10_000_000     # same range as the generator's grounding legs
+DELTA_SUFFIX = ".delta.json"
+# event-surge requests carry no crew positions; late copies of them get the base PIC + SIC
+DEFAULT_CREW_POSITIONS = [
+    {"PositionInCrew": "PIC", "CrewmemberRequiredProperties": [], "CrewmemberRestrictedProperties": []},
+    {"PositionInCrew": "SIC", "CrewmemberRequiredProperties": [], "CrewmemberRestrictedProperties": []},
+]
+
+
+def delta_path(scenario_filename: str) -> str:
+    return sidecar_path(scenario_filename, DELTA_SUFFIX)
+
+
+class ScenarioPerturber:
+    def __init__(self, scenario, airport_coords: dict = None):
+        """
+        scenario:        dict or path; a dict is modified in place
+        airport_coords:  ICAO -> (lat, lon), only needed for weather(epicenter, radius)
+        """
+        self.source = scenario if isinstance(scenario, str) else None
+        self.scenario = load_scenario(scenario)
+        self.geo = RouteTable(airport_coords=airport_coords) if airport_coords else None
+        s = self.scenario
+        for section in ("Tails", "FlightRequests", "Legs", "Crewmembers", "CrewActivities", "CrewFlyingTogether"):
+            s.setdefault(section, [])
+
+        horizon = s.get("Configuration", {}).get("PlanningHorizon", {})
+        self.horizon_end = to_minutes(horizon["EndTime"]) if "EndTime" in horizon else None
+        # generated files open the request window one day after the positioning BeginTime
+        self.window_start = to_minutes(horizon["BeginTime"]) + 24 * 60 if "BeginTime" in horizon else None
+
+        # === indexes ===
+        self.tails = {t["TailNumber"]: t for t in s["Tails"]}
+        self.tails_at = defaultdict(list)
+        for t in s["Tails"]:
+            self.tails_at[t.get("CurrentLocation")].append(t["TailNumber"])
+        self.crews = {c["CrewmemberID"]: c for c in s["Crewmembers"]}
+        self.activities_of = defaultdict(list)
+        for act in s["CrewActivities"]:
+            self.activities_of[act["CrewmemberID"]].append(act)
+        self.legs_of = defaultdict(list)
+        self.legs_by_tail = defaultdict(list)   # tail -> unlocked legs
+        self.locked = defaultdict(list)         # tail -> [(start, end)] of locked legs
+        for leg in s["Legs"]:
+            for ac in leg.get("AssignedCrewmembers", []):
+                self.legs_of[ac["CrewmemberID"]].append(leg)
+            if leg.get("IsLocked"):
+                start = to_minutes(leg["StartTime"])
+                self.locked[leg["TailNumber"]].append((start, start + leg.get("Duration", 0)))
+            else:
+                self.legs_by_tail[leg["TailNumber"]].append(leg)
+        self.pairs_of = defaultdict(list)
+        for pair in s["CrewFlyingTogether"]:
+            for cid in pair.get("Crewmembers", []):
+                self.pairs_of[cid].append(pair)
+        self.request_ids = {r["RequestID"] for r in s["FlightRequests"]}
+        # revenue requests late_requests() copies from, kept up to date by add_requests()
+        self.templates = [r for r in s["FlightRequests"] if r.get("ActivityType") == "OPERATE_REVENUE_FLIGHT"]
+
+        self._next_leg_id = max((l["LegID"] for l in s["Legs"]), default=DEFAULT_LEG_ID - 1) + 1
+        self._next_request_id = max(self.request_ids, default=0) + 1
+        self._removed = defaultdict(set)        # section -> id() of removed records
+        self.operations = []
+
+    # === helpers ===
+    def _span(self, start, duration_minutes):
+        """(start, end) minutes; start defaults to the request window, end to the horizon end."""
+        if start is None:
+            start = self.window_start
+        elif isinstance(start, str):
+            start = to_minutes(start)
+        if start is None:
+            raise ValueError("start is required: the scenario has no PlanningHorizon")
+        if duration_minutes is None:
+            if self.horizon_end is None:
+                raise ValueError("duration_minutes is required: the scenario has no PlanningHorizon")
+            duration_minutes = max(self.horizon_end - start, 0)
+        return start, start + duration_minutes
+
+    def _op(self, name: str, **params) -> dict:
+        op = {"Op": name, **params, "Added": defaultdict(list), "Removed": defaultdict(list),
+              "Modified": defaultdict(dict)}
+        self.operations.append(op)
+        return op
+
+    def _remove(self, op: dict, section: str, record: dict):
+        if id(record) in self._removed[section]:
+            return
+        self._removed[section].add(id(record))
+        key = SECTION_KEYS.get(section)
+        op["Removed"][section].append(record[key] if key else record)
+
+    def _modify(self, op: dict, section: str, rid, field: str, old, new):
+        changes = op["Modified"][section].setdefault(str(rid), {})
+        changes[field] = [changes[field][0] if field in changes else old, new]
+
+    def _grounding_leg(self, op: dict, tail_number, start: int, end: int, mx_type: str):
+        tail = self.tails[tail_number]
+        loc = tail.get("CurrentLocation")
+        leg = {
+            "TailNumber": tail_number,
+            "LegID": self._next_leg_id,
+            "RequestID": 0,
+            "IsLocked": True,
+            "OriginAirport": loc,
+            "DestinationAirport": loc,
+            "StartTime": from_minutes(start),
+            "Duration": end - start,
+            "ActivityType": "MAINTENANCE",
+            "AssignedCrewmembers": [],
+            "CrewModel": "NO_CREW",
+            "mxType": mx_type,
+        }
+        self._next_leg_id += 1
+        self.scenario["Legs"].append(leg)
+        self.locked[tail_number].append((start, end))
+        op["Added"]["Legs"].append(leg)
+        return leg
+
+    def _drop_leg(self, op: dict, leg: dict):
+        """remove an unlocked leg and the crew activities flying it."""
+        self._remove(op, "Legs", leg)
+        self.legs_by_tail[leg["TailNumber"]].remove(leg)
+        for ac in leg.get("AssignedCrewmembers", []):
+            cid = ac["CrewmemberID"]
+            if leg in self.legs_of.get(cid, ()):
+                self.legs_of[cid].remove(leg)
+            acts = self.activities_of.get(cid, [])
+            for act in [a for a in acts if a.get("LegID") == leg["LegID"]]:
+                self._remove(op, "CrewActivities", act)
+                acts.remove(act)
+
+    def _ground(self, op: dict, tail_number, begin: int, end: int, mx_type: str):
+        """
+        ground a tail over [begin, end): its unlocked legs overlapping it are
+        dropped, and locked legs are added for the parts no locked leg covers yet.
+        """
+        for leg in list(self.legs_by_tail.get(tail_number, ())):
+            start = to_minutes(leg["StartTime"])
+            if start < end and begin < start + leg.get("Duration", 0):
+                self._drop_leg(op, leg)
+        cursor = begin
+        for s, e in sorted(self.locked.get(tail_number, ())):
+            if s >= end:
+                break
+            if s > cursor:
+                self._grounding_leg(op, tail_number, cursor, s, mx_type)
+            cursor = max(cursor, e)
+        if cursor < end:
+            self._grounding_leg(op, tail_number, cursor, end, mx_type)
+
+    # === operators ===
+    def weather(self, epicenter: str = None, radius_miles: float = 30.0, airports=None,
+                start=None, duration_minutes: int = None) -> dict:
+        """ground every tail sitting at an affected airport (epicenter + radius, or an explicit list)."""
+        if airports is None:
+            if epicenter is None:
+                raise ValueError("weather needs an epicenter or an airport list")
+            if self.geo is None:
+                raise ValueError("weather(epicenter, radius) needs airport_coords")
+            airports = self.geo.within(epicenter, radius_miles) or {epicenter}
+        airports = set(airports)
+        begin, end = self._span(start, duration_minutes)
+        op = self._op("weather", Epicenter=epicenter, RadiusMiles=radius_miles, Start=from_minutes(begin),
+                      Duration=end - begin, AffectedAirports=sorted(airports))
+        for icao in sorted(airports):
+            for tail_number in self.tails_at.get(icao, ()):
+                self._ground(op, tail_number, begin, end, "WEATHER_GROUNDED")
+
+        w = self.scenario.setdefault("Weather", {"Enabled": False, "Epicenter": None, "AffectedAirports": []})
+        old = set(w.get("AffectedAirports", []))
+        if airports - old:
+            w["AffectedAirports"] = sorted(old | airports)
+            # list field: record the additions only, not the old / new lists
+            op["Modified"]["Weather"]["AffectedAirports"] = {"Added": sorted(airports - old)}
+        if not w.get("Enabled"):
+            op["Modified"]["Weather"]["Enabled"] = [w.get("Enabled", False), True]
+            op["Modified"]["Weather"]["Epicenter"] = [w.get("Epicenter"), epicenter]
+            w["Enabled"], w["Epicenter"] = True, epicenter
+        return op
+
+    def aircraft_on_ground(self, tail_numbers, start=None, duration_minutes: int = None) -> dict:
+        begin, end = self._span(start, duration_minutes)
+        op = self._op("aircraft_on_ground", Start=from_minutes(begin), Duration=end - begin)
+        for tail_number in tail_numbers:
+            if tail_number not in self.tails:
+                raise KeyError(f"unknown tail {tail_number!r}")
+            self._ground(op, tail_number, begin, end, "AOG")
+        return op
+
+    def crew_sick(self, crew_ids, start=None) -> dict:
+        """
+        crews call in sick at `start`: their tour ends there, later crew
+        activities and leg assignments are dropped, and every
+        CrewFlyingTogether pair they are in is removed (the partner stays
+        available on their own). A tour that only starts after `start` is
+        cancelled: it ends when it starts, and the op lists it in CancelledTours.
+        """
+        begin, _ = self._span(start, 0)
+        crew_ids = list(crew_ids)
+        # the ids themselves: a crew whose tour already ended changes nothing else
+        op = self._op("crew_sick", Start=from_minutes(begin), Crewmembers=crew_ids)
+        when = from_minutes(begin)
+        for cid in crew_ids:
+            crew = self.crews.get(cid)
+            if crew is None:
+                raise KeyError(f"unknown crewmember {cid!r}")
+            tour_start, tour_end = crew.get("tourStartDate"), crew.get("tourEndDate")
+            end, end_iso = begin, when
+            if tour_start is not None and to_minutes(tour_start) > begin:
+                end, end_iso = to_minutes(tour_start), tour_start
+                op.setdefault("CancelledTours", []).append(cid)
+            if tour_end is None or to_minutes(tour_end) > end:
+                self._modify(op, "Crewmembers", cid, "tourEndDate", tour_end, end_iso)
+                crew["tourEndDate"] = end_iso
+
+            for act in self.activities_of.get(cid, ()):
+                if to_minutes(act["StartTime"]) >= begin:
+                    self._remove(op, "CrewActivities", act)
+            for leg in self.legs_of.get(cid, ()):
+                if leg.get("IsLocked") or to_minutes(leg["StartTime"]) < begin:
+                    continue
+                old = leg["AssignedCrewmembers"]
+                new = [ac for ac in old if ac["CrewmemberID"] != cid]
+                if len(new) != len(old):
+                    self._modify(op, "Legs", leg["LegID"], "AssignedCrewmembers", old, new)
+                    leg["AssignedCrewmembers"] = new
+            for pair in self.pairs_of.pop(cid, ()):
+                self._remove(op, "CrewFlyingTogether", pair)
+                for other in pair.get("Crewmembers", []):
+                    if other != cid and pair in self.pairs_of.get(other, ()):
+                        self.pairs_of[other].remove(pair)
+        return op
+
+    def add_requests(self, requests: list, op: dict = None) -> dict:
+        """append requests, giving new ids to requests without one (or with a taken one)."""
+        op = op or self._op("add_requests")
+        for req in requests:
+            if "RequestID" not in req or req["RequestID"] in self.request_ids:
+                req["RequestID"] = self._next_request_id
+            self._next_request_id = max(self._next_request_id, req["RequestID"] + 1)
+            self.request_ids.add(req["RequestID"])
+            self.scenario["FlightRequests"].append(req)
+            if req.get("ActivityType") == "OPERATE_REVENUE_FLIGHT":
+                self.templates.append(req)
+            op["Added"]["FlightRequests"].append(req)
+        return op
+
+    def late_requests(self, count: int, release=None, lead_minutes=(60, 360), seed=None) -> dict:
+        """
+        `count` revenue requests that only become known at `release` (default:
+        window start) and depart lead_minutes later; airports, crew positions
+        and tail types are drawn from existing revenue requests.
+        """
+        rng = random.Random(seed)
+        begin, _ = self._span(release, 0)
+        templates = self.templates
+        if count and not templates:
+            raise ValueError("late_requests needs at least one revenue request to copy from")
+        op = self._op("late_requests", Release=from_minutes(begin), Count=count)
+        new = []
+        for _ in range(count):
+            a, b = rng.choice(templates), rng.choice(templates)
+            dep, arr = a["DepartureAirport"], b["ArrivalAirport"]
+            if dep == arr:
+                arr = a["ArrivalAirport"]
+            new.append({
+                "ArrivalAirport": arr,
+                "DepartureAirport": dep,
+                "ActivityType": "OPERATE_REVENUE_FLIGHT",
+                "RequestedTime": from_minutes(begin + rng.randint(*lead_minutes)),
+                "RequiredCrewmemberPositions": json.loads(json.dumps(a.get("RequiredCrewmemberPositions",
+                                                                           DEFAULT_CREW_POSITIONS))),
+                "AllowedTailTypes": json.loads(json.dumps(a["AllowedTailTypes"])),
+                "requestedAircraftTypeName": a.get("requestedAircraftTypeName"),
+                "TailRequiredProperties": list(a.get("TailRequiredProperties", [])),
+                "ReleaseTime": from_minutes(begin),
+            })
+        return self.add_requests(new, op)
+
+    # === output ===
+    def result(self) -> dict:
+        """the perturbed scenario (sections with removals are rebuilt once, here)."""
+        for section, removed in self._removed.items():
+            if removed:
+                self.scenario[section] = [r for r in self.scenario[section] if id(r) not in removed]
+                removed.clear()
+        return self.scenario
+
+    def delta(self) -> dict:
+        ops = []
+        for op in self.operations:
+            out = {k: v for k, v in op.items() if k not in ("Added", "Removed", "Modified")}
+            for part in ("Added", "Removed", "Modified"):
+                if op[part]:
+                    out[part] = dict(op[part])
+            ops.append(out)
+        return {"Base": self.source, "Operations": ops}
+
+    def write(self, filename: str, compression=None, indent=2) -> tuple:
+        """write the scenario and its <scenario>.delta.json; return both paths."""
+        path = write_scenario(self.result(), filename, compression=compression, indent=indent)
+        dpath = delta_path(output_path(filename, compression))
+        with open(dpath, "w") as f:
+            json.dump(self.delta(), f, indent=1)
+        return path, dpath
+
+
+def check_operators(scenario, airport_coords: dict = None, seed: int = 0) -> list:
+    """
+    run every operator once on a copy of scenario and validate the result;
+    return the error findings that the unperturbed scenario does not already have.
+    """
+    base = json.loads(json.dumps(load_scenario(scenario)))
+    before = {}
+    for f in validate_scenario(base):
+        if f["severity"] == ERROR:
+            before[f["code"]] = before.get(f["code"], 0) + 1
+
+    rng = random.Random(seed)
+    p = ScenarioPerturber(json.loads(json.dumps(base)), airport_coords=airport_coords)
+    tails = base["Tails"]
+    crews = base.get("Crewmembers", [])
+    if tails:
+        # ground tails that have legs to drop, not only random (mostly idle) ones
+        begin, end = p._span(None, 12 * 60)
+        busy = sorted(tail for tail, legs in p.legs_by_tail.items() if tail in p.tails and any(
+            to_minutes(l["StartTime"]) < end and begin < to_minutes(l["StartTime"]) + l.get("Duration", 0)
+            for l in legs))
+        rng.shuffle(busy)
+        loc = p.tails[busy[0]]["CurrentLocation"] if busy else rng.choice(tails)["CurrentLocation"]
+        if airport_coords is None:
+            p.weather(loc, airports=[loc])
+        else:
+            p.weather(loc)
+        aog = busy[1:3] + [t["TailNumber"] for t in rng.sample(tails, min(2, len(tails)))]
+        p.aircraft_on_ground(aog, duration_minutes=12 * 60)
+    if crews:
+        # paired crews, plus crews whose tour starts after the sick call
+        sick = {c for pair in base.get("CrewFlyingTogether", [])[:3] for c in pair["Crewmembers"][:1]}
+        sick |= {c["CrewmemberID"] for c in crews
+                 if c.get("tourStartDate") and p.window_start is not None
+                 and to_minutes(c["tourStartDate"]) > p.window_start}
+        sick |= {c["CrewmemberID"] for c in rng.sample(crews, min(5, len(crews)))}
+        p.crew_sick(sorted(sick))
+    p.late_requests(20, seed=seed)
+
+    counts = {}
+    new = []
+    for f in validate_scenario(p.result()):
+        if f["severity"] != ERROR:
+            continue
+        counts[f["code"]] = counts.get(f["code"], 0) + 1
+        if counts[f["code"]] > before.get(f["code"], 0):
+            new.append(f)
+    return new
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="inject disruptions into a scenario")
+    parser.add_argument("scenario")
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--check", action="store_true",
+                        help="run every operator once on the scenario and validate the result")
+    parser.add_argument("--srd", default=None, help="srd.json, for --weather with a radius")
+    parser.add_argument("--weather", metavar="ICAO", help="weather epicenter")
+    parser.add_argument("--radius", type=float, default=30.0)
+    parser.add_argument("--aog", default="", help="comma separated tail numbers")
+    parser.add_argument("--sick", default="", help="comma separated crewmember ids")
+    parser.add_argument("--late", type=int, default=0, help="number of late requests")
+    parser.add_argument("--start", default=None, help="disruption time (default: request window start)")
+    parser.add_argument("--duration", type=int, default=None, help="grounding minutes (default: to horizon end)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--compression", choices=["gzip", "zstd"], default=None)
+    args = parser.parse_args()
+
+    coords = load_airport_coords(args.srd) if args.srd else None
+    if args.check:
+        findings = check_operators(args.scenario, coords, args.seed or 0)
+        for f in findings[:20]:
+            print(f"[-] {f['code']} {f['section']}[{f['index']}] {f['id']}: {f['message']}")
+        print(f"[+] {len(findings)} new errors after running every operator")
+        raise SystemExit(1 if findings else 0)
+    if args.out is None:
+        parser.error("--out is required")
+    p = ScenarioPerturber(args.scenario, airport_coords=coords)
+    if args.weather:
+        if coords is None:
+            p.weather(args.weather, airports=[args.weather], start=args.start, duration_minutes=args.duration)
+        else:
+            p.weather(args.weather, args.radius, start=args.start, duration_minutes=args.duration)
+    if args.aog:
+        p.aircraft_on_ground(args.aog.split(","), start=args.start, duration_minutes=args.duration)
+    if args.sick:
+        p.crew_sick([int(c) for c in args.sick.split(",")], start=args.start)
+    if args.late:
+        p.late_requests(args.late, release=args.start, seed=args.seed)
+    path, dpath = p.write(args.out, compression=args.compression)
+    for op in p.delta()["Operations"]:
+        counts = {part: {s: len(v) for s, v in op.get(part, {}).items()} for part in ("Added", "Removed", "Modified")}
+        print(f"[+] {op['Op']}: {counts}")
+    print(f"✅ {path} + {dpath}")
@@ -0,0 +1,282 @@
+"""Stream records out of a scenario json without json.load-ing the whole file.
+
+    for req in iter_section("scenario_low_high_low_low.json", "FlightRequests",
+                            where=time_window("2025-04-01T06:00:00Z", "2025-04-01T12:00:00Z")):
+        ...
+
+The file is walked incrementally; list sections are yielded one record at a
+time. The first walk writes a small sidecar (<scenario>.idx.json) with the byte
+offset of every top-level section, so re-opening the file seeks straight to the
+requested section. The sidecar is ignored when the scenario's size or mtime
+changed. .gz / .zst scenarios work too (seeking there means decompressing up
+to the section, so the index saves parsing but not decompression).
+
+usage:
+    python scenario_reader.py scenario.json Tails [--limit 5]
+    python scenario_reader.py scenario.json --index
+"""
+import argparse
+import json
+import os
+
+from scenario_common import LIST_SECTIONS, open_scenario_file, to_minutes
+
+CHUNK_SIZE = 1 << 16
+INDEX_SUFFIX = ".idx.json"
+_WS = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class _Buffer:
+    """
+    latin-1 decoded window over the file: one char == one byte, so string
+    positions are byte offsets. Records containing non-ascii text are
+    re-decoded as utf-8 on the way out.
+    """
+
+    def __init__(self, f, offset=0):
+        self.f = f
+        f.seek(offset)
+        self.base = offset          # byte offset of text[0]
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        # drop the consumed prefix so the buffer stays small
+        self.base += self.pos
+        self.text = self.text[self.pos:] + chunk.decode("latin-1")
+        self.pos = 0
+        return True
+
+    def offset(self):
+        return self.base + self.pos
+
+    def peek(self):
+        """next non-whitespace char (without consuming it), '' at eof."""
+        while True:
+            text, pos = self.text, self.pos
+            while pos < len(text) and text[pos] in _WS:
+                pos += 1
+            self.pos = pos
+            if pos < len(text):
+                return text[pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, ch):
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"expected {ch!r} at byte {self.offset()}, got {got!r}")
+        self.pos += 1
+
+    def value(self):
+        """decode the next json value, reading more of the file as needed."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # a number at the very end of the buffer may be cut short
+            if end == len(self.text) and not self.eof and self.fill():
+                continue
+            raw = self.text[self.pos:end]
+            self.pos = end
+            if not raw.isascii():
+                obj = json.loads(raw.encode("latin-1").decode("utf-8"))
+            return obj
+
+
+def _iter_array(buf: _Buffer):
+    """yield the elements of the array starting at the buffer position."""
+    buf.expect("[")
+    if buf.peek() == "]":
+        buf.pos += 1
+        return
+    while True:
+        yield buf.value()
+        sep = buf.peek()
+        buf.pos += 1
+        if sep == "]":
+            return
+        if sep != ",":
+            raise ValueError(f"expected ',' or ']' at byte {buf.offset() - 1}, got {sep!r}")
+
+
+def _walk_top_level(f):
+    """
+    yield (section, value_offset, buffer) for each top-level key.
+    The caller must consume (or skip) the value before asking for the next key.
+    """
+    buf = _Buffer(f)
+    buf.expect("{")
+    if buf.peek() == "}":
+        return
+    while True:
+        key = buf.value()
+        buf.expect(":")
+        buf.peek()
+        yield key, buf.offset(), buf
+        sep = buf.peek()
+        buf.pos += 1
+        if sep == "}":
+            return
+        if sep != ",":
+            raise ValueError(f"expected ',' or '}}' at byte {buf.offset() - 1}, got {sep!r}")
+
+
+def _skip_value(buf: _Buffer):
+    """skip one value; arrays element by element so big sections never sit in memory."""
+    if buf.peek() == "[":
+        count = 0
+        for _ in _iter_array(buf):
+            count += 1
+        return count
+    buf.value()
+    return None
+
+
+# === sidecar index ===
+def index_path(path: str) -> str:
+    return path + INDEX_SUFFIX
+
+
+def _file_stamp(path: str) -> dict:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def build_index(path: str, write: bool = True) -> dict:
+    """walk the file once and record where every top-level section starts."""
+    sections = {}
+    with open_scenario_file(path) as f:
+        for key, offset, buf in _walk_top_level(f):
+            count = _skip_value(buf)
+            sections[key] = {"offset": offset, "count": count}
+    index = {**_file_stamp(path), "sections": sections}
+    if write:
+        try:
+            with open(index_path(path), "w") as f:
+                json.dump(index, f)
+        except OSError:
+            pass    # read-only location, the index just isn't cached
+    return index
+
+
+def load_index(path: str, build: bool = True):
+    """return the sidecar index if it is still valid for the file, else rebuild it."""
+    try:
+        with open(index_path(path), "r") as f:
+            index = json.load(f)
+        if {k: index.get(k) for k in ("size", "mtime_ns")} == _file_stamp(path):
+            return index
+    except (OSError, ValueError):
+        pass
+    return build_index(path) if build else None
+
+
+# === readers ===
+def list_sections(path: str) -> dict:
+    """section -> record count (None for non-list sections)."""
+    return {k: v["count"] for k, v in load_index(path)["sections"].items()}
+
+
+def iter_section(path: str, section: str, where=None, use_index: bool = True):
+    """
+    yield the records of a list section (or the single value of a dict/str
+    section), keeping only those for which where(record) is true.
+    """
+    with open_scenario_file(path) as f:
+        index = load_index(path) if use_index else None
+        if index is not None:
+            if section not in index["sections"]:
+                return
+            buf = _Buffer(f, index["sections"][section]["offset"])
+        else:
+            for key, _, buf in _walk_top_level(f):
+                if key == section:
+                    break
+                _skip_value(buf)
+            else:
+                return
+
+        if buf.peek() != "[":
+            value = buf.value()
+            if where is None or where(value):
+                yield value
+            return
+        for rec in _iter_array(buf):
+            if where is None or where(rec):
+                yield rec
+
+
+def read_section(path: str, section: str, where=None, use_index: bool = True):
+    """materialize one section: a list for list sections, the value (or None) otherwise."""
+    records = list(iter_section(path, section, where, use_index))
+    if section in LIST_SECTIONS:
+        return records
+    return records[0] if records else None
+
+
+# === filters ===
+def time_window(start: str, end: str, field: str = "RequestedTime"):
+    """records whose `field` falls in [start, end)."""
+    lo, hi = to_minutes(start), to_minutes(end)
+
+    def pred(rec):
+        ts = rec.get(field)
+        return ts is not None and lo <= to_minutes(ts) < hi
+    return pred
+
+
+def at_airport(icao, field: str = "CurrentLocation"):
+    """records whose `field` is the airport (or one of the airports) given."""
+    wanted = {icao} if isinstance(icao, str) else set(icao)
+
+    def pred(rec):
+        return rec.get(field) in wanted
+    return pred
+
+
+def all_of(*preds):
+    def pred(rec):
+        return all(p(rec) for p in preds)
+    return pred
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="stream one section out of a scenario json")
+    parser.add_argument("scenario")
+    parser.add_argument("section", nargs="?")
+    parser.add_argument("--index", action="store_true", help="(re)build the sidecar index and list sections")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--airport", help="keep records whose CurrentLocation / DepartureAirport is this ICAO")
+    parser.add_argument("--start", help="keep records with RequestedTime/StartTime >= this")
+    parser.add_argument("--end", help="keep records with RequestedTime/StartTime < this")
+    args = parser.parse_args()
+
+    if args.index or not args.section:
+        if args.index:
+            build_index(args.scenario)
+        for name, count in list_sections(args.scenario).items():
+            print(f"{name}: {count if count is not None else '-'}")
+    else:
+        preds = []
+        if args.airport:
+            field = "DepartureAirport" if args.section in ("FlightRequests", "Legs") else "CurrentLocation"
+            preds.append(at_airport(args.airport, field))
+        if args.start or args.end:
+            field = "RequestedTime" if args.section == "FlightRequests" else "StartTime"
+            preds.append(time_window(args.start or "0001-01-01T00:00:00Z",
+                                     args.end or "9999-12-31T23:59:59Z", field))
+        for n, rec in enumerate(iter_section(args.scenario, args.section, all_of(*preds) if preds else None)):
+            if args.limit is not None and n >= args.limit:
+                break
+            print(json.dumps(rec))
@@ -0,0 +1,283 @@
+"""Replay a scenario as a time-ordered stream of JSON lines, for load testing
+an online dispatch service.
+
+Flight requests, maintenance requests and disruption events (locked grounding
+legs, plus the operations of a <scenario>.delta.json from scenario_perturb)
+are sorted by scenario time and sent one JSON object per line:
+
+    {"Seq": 17, "Time": "2025-04-01T06:12:00Z", "Type": "FlightRequest", "SentAt": 1712.3, "Payload": {...}}
+
+Requests are keyed by RequestedTime (ReleaseTime for late requests, which are
+only known from then on), legs by StartTime. `speed` maps scenario time to wall
+time: 1 = real time, 60 = one scenario hour per wall minute, 0 = as fast as the
+consumer reads.
+
+Targets: "-" (stdout), a file / named pipe path, tcp://host:port or
+unix:///path. A bounded queue sits between the clock and the sender thread;
+when the consumer falls behind, socket writes block, the queue fills and the
+clock waits (blocked_seconds), so nothing is buffered without bound. Lag is
+wall time between an event's scheduled release and its write.
+
+    python scenario_replay.py --serve tcp://127.0.0.1:9000                  # stand-in consumer
+    python scenario_replay.py scenario.json --to tcp://127.0.0.1:9000 --speed 600
+    python scenario_replay.py scenario.json --stand-in --speed 0            # both, in one process
+"""
+import json
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+
+from scenario_common import from_minutes, load_scenario, to_minutes
+from scenario_perturb import delta_path
+
+SEND_BUFFER = 1 << 16
+_STOP = object()
+
+
+# === events ===
+def replay_events(scenario, delta: dict = None) -> list:
+    """[(minute, type, payload)] sorted by scenario time (stable within a minute)."""
+    scenario = load_scenario(scenario)
+    events = []
+    for req in scenario.get("FlightRequests", []):
+        kind = "MaintenanceRequest" if req.get("ActivityType") == "MAINTENANCE" else "FlightRequest"
+        events.append((to_minutes(req.get("ReleaseTime") or req["RequestedTime"]), kind, req))
+    for leg in scenario.get("Legs", []):
+        if leg.get("IsLocked") and leg.get("mxType"):
+            events.append((to_minutes(leg["StartTime"]), "Disruption",
+                           {"Kind": leg["mxType"], "Leg": leg}))
+    for op in (delta or {}).get("Operations", []):
+        # grounding legs and late requests are already in the scenario; replay the rest
+        if op["Op"] == "crew_sick":
+            crew_ids = op.get("Crewmembers")
+            if crew_ids is None:    # older deltas: only the crews whose tour changed
+                crew_ids = [int(c) if c.isdigit() else c for c in op.get("Modified", {}).get("Crewmembers", {})]
+            events.append((to_minutes(op["Start"]), "Disruption",
+                           {"Kind": "CREW_SICK", "Crewmembers": crew_ids, "Removed": op.get("Removed", {})}))
+    events.sort(key=lambda e: e[0])
+    return events
+
+
+def load_delta(scenario_path: str):
+    """the scenario's <scenario>.delta.json, if there is one."""
+    path = delta_path(scenario_path)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+# === targets ===
+def _address(target: str):
+    if target.startswith("tcp://"):
+        host, port = target[len("tcp://"):].rsplit(":", 1)
+        return socket.AF_INET, (host, int(port))
+    if target.startswith("unix://"):
+        return socket.AF_UNIX, target[len("unix://"):]
+    return None, None
+
+
+def open_target(target: str, connect_timeout: float = 10.0):
+    """binary writable stream for "-", a path, tcp://host:port or unix:///path."""
+    if target == "-":
+        return sys.stdout.buffer, False
+    family, address = _address(target)
+    if family is None:
+        return open(target, "wb", buffering=SEND_BUFFER), True
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.connect(address)
+            break
+        except OSError:
+            sock.close()
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)     # consumer still starting
+    return sock.makefile("wb", buffering=SEND_BUFFER), True
+
+
+# === producer ===
+class Replayer:
+    def __init__(self, target: str, speed: float = 1.0, max_pending: int = 1000, flush_every: int = 1):
+        """
+        speed:        scenario minutes per wall minute (0 = no pacing)
+        max_pending:  events queued for the sender before the clock blocks
+        flush_every:  flush the stream every N events (1 = lowest latency)
+        """
+        self.target = target
+        self.speed = speed
+        self.flush_every = flush_every
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lags = []
+        self._error = None
+        self.stats = {"sent": 0, "bytes": 0, "blocked_seconds": 0.0, "wall_seconds": 0.0}
+
+    def _sender(self, stream):
+        pending = 0
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                due, line = item
+                stream.write(line)      # blocks while the consumer is behind
+                pending += 1
+                if pending >= self.flush_every or self._queue.empty():
+                    stream.flush()
+                    pending = 0
+                self._lags.append(time.perf_counter() - due)
+                self.stats["sent"] += 1
+                self.stats["bytes"] += len(line)
+            stream.flush()
+        except OSError as e:    # consumer went away
+            self._error = e
+            while self._queue.get() is not _STOP:     # drain so the producer never blocks forever
+                pass
+
+    def run(self, events: list) -> dict:
+        stream, close = open_target(self.target)
+        sender = threading.Thread(target=self._sender, args=(stream,), daemon=True)
+        sender.start()
+        t0 = time.perf_counter()
+        first = events[0][0] if events else 0
+        try:
+            for seq, (minute, kind, payload) in enumerate(events):
+                due = t0 + (minute - first) * 60.0 / self.speed if self.speed else time.perf_counter()
+                wait = due - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+                line = json.dumps({"Seq": seq, "Time": from_minutes(minute), "Type": kind, "SentAt": time.time(),
+                                   "Payload": payload}, separators=(",", ":")).encode() + b"\n"
+                t_put = time.perf_counter()
+                self._queue.put((due, line))
+                self.stats["blocked_seconds"] += time.perf_counter() - t_put
+                if self._error is not None:
+                    break
+        finally:
+            self._queue.put(_STOP)
+            sender.join()
+            if close:
+                stream.close()
+        self.stats["wall_seconds"] = time.perf_counter() - t0
+        if self._error is not None:
+            raise ConnectionError(f"replay to {self.target} stopped after {self.stats['sent']} events") \
+                from self._error
+        return self.summary()
+
+    def summary(self) -> dict:
+        wall = self.stats["wall_seconds"] or 1e-9
+        return {**self.stats, "events_per_second": self.stats["sent"] / wall,
+                **_percentiles("lag", self._lags)}
+
+
+def _percentiles(name: str, values: list) -> dict:
+    if not values:
+        return {}
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+    return {f"{name}_p50_ms": pick(0.5) * 1000, f"{name}_p95_ms": pick(0.95) * 1000,
+            f"{name}_max_ms": values[-1] * 1000}
+
+
+# === stand-in consumer ===
+class StandInConsumer:
+    """local stand-in for the dispatch service: counts events and delivery latency (SentAt -> read)."""
+
+    def __init__(self, target: str, process_seconds: float = 0.0):
+        family, address = _address(target)
+        if family is None:
+            raise ValueError(f"stand-in consumer needs tcp:// or unix://, got {target!r}")
+        if family == socket.AF_UNIX and os.path.exists(address):
+            os.remove(address)
+        self.process_seconds = process_seconds      # per event, to simulate a slow service
+        self._server = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(address)
+        self._server.listen(1)
+        self.address = address
+        if family == socket.AF_INET:     # port 0 -> the port actually bound
+            host, port = self._server.getsockname()[:2]
+            self.target = f"tcp://{host}:{port}"
+        else:
+            self.target = target
+        self._latencies = []
+        self.counts = {}
+        self.stats = {"received": 0, "bytes": 0, "out_of_order": 0}
+        self._thread = None
+
+    def serve_one(self):
+        """accept one producer and read until it disconnects."""
+        conn, _ = self._server.accept()
+        last = None
+        with conn, conn.makefile("rb") as stream:
+            for line in stream:
+                event = json.loads(line)
+                self._latencies.append(time.time() - event["SentAt"])
+                self.stats["received"] += 1
+                self.stats["bytes"] += len(line)
+                self.counts[event["Type"]] = self.counts.get(event["Type"], 0) + 1
+                if last is not None and event["Time"] < last:
+                    self.stats["out_of_order"] += 1
+                last = event["Time"]
+                if self.process_seconds:
+                    time.sleep(self.process_seconds)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_one, daemon=True)
+        self._thread.start()
+        return self
+
+    def join(self, timeout: float = None) -> dict:
+        self._thread.join(timeout)
+        self._server.close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)
+        return self.summary()
+
+    def summary(self) -> dict:
+        return {**self.stats, "by_type": dict(self.counts), **_percentiles("latency", self._latencies)}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="stream scenario requests / events as time-ordered JSON lines")
+    parser.add_argument("scenario", nargs="?")
+    parser.add_argument("--to", default="-", help="-, a file / pipe path, tcp://host:port or unix:///path")
+    parser.add_argument("--speed", type=float, default=60.0, help="scenario minutes per wall minute (0 = max)")
+    parser.add_argument("--max-pending", type=int, default=1000)
+    parser.add_argument("--flush-every", type=int, default=1)
+    parser.add_argument("--no-delta", action="store_true", help="ignore <scenario>.delta.json")
+    parser.add_argument("--serve", metavar="ADDRESS", help="only run the stand-in consumer on ADDRESS")
+    parser.add_argument("--stand-in", action="store_true", help="replay to an in-process stand-in consumer")
+    parser.add_argument("--process-ms", type=float, default=0.0, help="stand-in consumer time per event")
+    args = parser.parse_args()
+
+    if args.serve:
+        consumer = StandInConsumer(args.serve, args.process_ms / 1000)
+        print(f"[+] stand-in consumer listening on {args.serve}", file=sys.stderr)
+        consumer.serve_one()
+        print(f"[+] consumer: {consumer.summary()}", file=sys.stderr)
+        sys.exit(0)
+    if not args.scenario:
+        parser.error("scenario is required unless --serve is given")
+
+    consumer = None
+    target = args.to
+    if args.stand_in:
+        target = target if target.startswith(("tcp://", "unix://")) else "tcp://127.0.0.1:0"
+        consumer = StandInConsumer(target, args.process_ms / 1000).start()
+        target = consumer.target
+
+    events = replay_events(args.scenario, None if args.no_delta else load_delta(args.scenario))
+    print(f"[+] replaying {len(events)} events to {target} at speed {args.speed or 'max'}", file=sys.stderr)
+    stats = Replayer(target, args.speed, args.max_pending, args.flush_every).run(events)
+    print(f"✅ producer: {stats}", file=sys.stderr)
+    if consumer is not None:
+        print(f"✅ consumer: {consumer.join()}", file=sys.stderr)
@@ -0,0 +1,223 @@
+"""Time-sharded scenario output for rolling-horizon solving.
+
+The PlanningHorizon is cut into windows of `shard_hours`. Sections are fed to
+a ShardBuilder as generate_scenario produces them and every record is put in
+the window(s) it touches:
+
+    FlightRequests   -> window containing RequestedTime
+    Legs / CrewActivities -> every window the [StartTime, StartTime+Duration) interval overlaps
+    Crewmembers      -> every window their tour overlaps
+
+At each window boundary the carry-over state is computed by replaying legs and
+crew activities in start order: tail location / available time / locked-until
+and crew on-tour / location / busy-until. Each shard is a loadable scenario
+(Tails carry the boundary location and available time) plus a "CarryOver"
+block, and manifest.json lists the shards.
+"""
+import bisect
+import json
+import os
+from collections import defaultdict
+
+from scenario_common import from_minutes, to_minutes
+
+MANIFEST_NAME = "manifest.json"
+SHARDED_SECTIONS = ["FlightRequests", "Legs", "CrewActivities", "Crewmembers"]
+
+
+def shard_windows(begin_min: int, end_min: int, shard_hours: float) -> list:
+    """[(lo, hi)] minute windows covering [begin, end); the last one may be short."""
+    step = int(shard_hours * 60)
+    if step <= 0:
+        raise ValueError(f"Invalid shard_hours: {shard_hours}")
+    windows = []
+    lo = begin_min
+    while lo < end_min:
+        windows.append((lo, min(lo + step, end_min)))
+        lo += step
+    return windows or [(begin_min, end_min)]
+
+
+def _interval(section: str, rec: dict):
+    if section == "FlightRequests":
+        t = to_minutes(rec["RequestedTime"])
+        return t, t
+    if section == "Crewmembers":
+        return to_minutes(rec["tourStartDate"]), to_minutes(rec["tourEndDate"])
+    start = to_minutes(rec["StartTime"])
+    return start, start + rec.get("Duration", 0)
+
+
+class ShardBuilder:
+    def __init__(self, begin_time: str, end_time: str, shard_hours: float):
+        self.windows = shard_windows(to_minutes(begin_time), to_minutes(end_time), shard_hours)
+        self._starts = [lo for lo, _ in self.windows]
+        self.buckets = [defaultdict(list) for _ in self.windows]
+        self.tails = []
+        self.legs = []
+        self.crews = []
+        self.crew_activities = []
+        self.fly_together = []
+
+    def _window_range(self, start: int, end: int):
+        """indexes of the windows overlapping [start, end]; out-of-horizon records clip to the edges."""
+        first = max(bisect.bisect_right(self._starts, start) - 1, 0)
+        last = max(bisect.bisect_right(self._starts, end) - 1, first)
+        if end > start and last > first and self._starts[last] == end:
+            last -= 1   # ends exactly on a boundary: doesn't touch the next window
+        return range(first, min(last, len(self.windows) - 1) + 1)
+
+    def add(self, section: str, rec: dict):
+        if section == "Tails":
+            self.tails.append(rec)
+            return
+        if section == "CrewFlyingTogether":
+            self.fly_together.append(rec)
+            return
+        if section == "Legs":
+            self.legs.append(rec)
+        elif section == "Crewmembers":
+            self.crews.append(rec)
+        elif section == "CrewActivities":
+            self.crew_activities.append(rec)
+        start, end = _interval(section, rec)
+        for w in self._window_range(start, end):
+            self.buckets[w][section].append(rec)
+
+    def add_many(self, section: str, records: list):
+        for rec in records:
+            self.add(section, rec)
+
+    # === carry-over state ===
+    def _tail_states(self) -> list:
+        """per boundary: {tail: {CurrentLocation, AvailableTime(min), LockedUntil(min)}}"""
+        state = {t["TailNumber"]: {"CurrentLocation": t.get("CurrentLocation"),
+                                   "AvailableTime": to_minutes(t["AvailableTime"]),
+                                   "LockedUntil": None}
+                 for t in self.tails}
+        legs = sorted(((to_minutes(l["StartTime"]), l) for l in self.legs if l.get("TailNumber") in state),
+                      key=lambda x: x[0])
+        snapshots = []
+        i = 0
+        for lo, _ in self.windows:
+            while i < len(legs) and legs[i][0] < lo:
+                start, leg = legs[i]
+                s = state[leg["TailNumber"]]
+                end = start + leg.get("Duration", 0)
+                s["CurrentLocation"] = leg.get("DestinationAirport", s["CurrentLocation"])
+                s["AvailableTime"] = max(s["AvailableTime"], end)
+                if leg.get("IsLocked"):
+                    s["LockedUntil"] = max(s["LockedUntil"] or end, end)
+                i += 1
+            snapshots.append({k: {**v, "LockedUntil": v["LockedUntil"] if (v["LockedUntil"] or lo) > lo else None}
+                              for k, v in state.items()})
+        return snapshots
+
+    def _crew_states(self) -> list:
+        """per boundary: {crew: {OnTour, CurrentLocation, BusyUntil(min)}}"""
+        loc = {c["CrewmemberID"]: c.get("CurrentLocation") for c in self.crews}
+        busy = {}
+        tours = {c["CrewmemberID"]: (to_minutes(c["tourStartDate"]), to_minutes(c["tourEndDate"]))
+                 for c in self.crews}
+        acts = sorted(((to_minutes(a["StartTime"]), a) for a in self.crew_activities), key=lambda x: x[0])
+        snapshots = []
+        i = 0
+        for lo, _ in self.windows:
+            while i < len(acts) and acts[i][0] < lo:
+                start, act = acts[i]
+                cid = act["CrewmemberID"]
+                loc[cid] = act.get("DestinationAirport", loc.get(cid))
+                busy[cid] = max(busy.get(cid, start), start + act.get("Duration", 0))
+                i += 1
+            snapshots.append({
+                cid: {"OnTour": t0 <= lo < t1,
+                      "CurrentLocation": loc.get(cid),
+                      "BusyUntil": busy[cid] if busy.get(cid, lo) > lo else None}
+                for cid, (t0, t1) in tours.items()
+            })
+        return snapshots
+
+    # === output ===
+    def shards(self, extra: dict = None):
+        """yield (index, shard scenario dict)."""
+        tail_states = self._tail_states()
+        crew_states = self._crew_states()
+        for w, (lo, hi) in enumerate(self.windows):
+            bucket = self.buckets[w]
+            tails = []
+            tail_carry = []
+            for t in self.tails:
+                s = tail_states[w][t["TailNumber"]]
+                tails.append({**t, "CurrentLocation": s["CurrentLocation"],
+                              "AvailableTime": from_minutes(s["AvailableTime"])})
+                tail_carry.append({"TailNumber": t["TailNumber"], "CurrentLocation": s["CurrentLocation"],
+                                   "AvailableTime": from_minutes(s["AvailableTime"]),
+                                   "LockedUntil": from_minutes(s["LockedUntil"]) if s["LockedUntil"] else None})
+            crew_ids = {c["CrewmemberID"] for c in bucket["Crewmembers"]}
+            crew_carry = []
+            for cid in sorted(crew_ids):
+                s = crew_states[w][cid]
+                crew_carry.append({"CrewmemberID": cid, "OnTour": s["OnTour"],
+                                   "CurrentLocation": s["CurrentLocation"],
+                                   "BusyUntil": from_minutes(s["BusyUntil"]) if s["BusyUntil"] else None})
+            crews = [{**c, "CurrentLocation": crew_states[w][c["CrewmemberID"]]["CurrentLocation"]}
+                     for c in bucket["Crewmembers"]]
+            yield w, {
+                "Window": {"Index": w, "BeginTime": from_minutes(lo), "EndTime": from_minutes(hi)},
+                "Tails": tails,
+                "FlightRequests": bucket["FlightRequests"],
+                "Legs": bucket["Legs"],
+                "Crewmembers": crews,
+                "CrewActivities": bucket["CrewActivities"],
+                "CrewFlyingTogether": [p for p in self.fly_together
+                                       if all(m in crew_ids for m in p.get("Crewmembers", []))],
+                "CarryOver": {"Tails": tail_carry, "Crewmembers": crew_carry},
+                **(extra or {}),
+                "Configuration": {"PlanningHorizon": {"BeginTime": from_minutes(lo), "EndTime": from_minutes(hi)}},
+            }
+
+    def write(self, out_dir: str, extra: dict = None, indent=None) -> dict:
+        """write shard_XXX.json files plus manifest.json into out_dir; return the manifest."""
+        os.makedirs(out_dir, exist_ok=True)
+        manifest = {"ShardHours": (self.windows[0][1] - self.windows[0][0]) / 60, "Shards": []}
+        for w, shard in self.shards(extra):
+            name = f"shard_{w:03d}.json"
+            with open(os.path.join(out_dir, name), "w") as f:
+                json.dump(shard, f, indent=indent)
+            manifest["Shards"].append({
+                **shard["Window"],
+                "File": name,
+                "Counts": {s: len(shard[s]) for s in SHARDED_SECTIONS},
+            })
+        with open(os.path.join(out_dir, MANIFEST_NAME), "w") as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+
+def write_shards(scenario: dict, shard_hours: float, out_dir: str) -> dict:
+    """shard an already built scenario dict (same output as feeding a ShardBuilder during generation)."""
+    horizon = scenario["Configuration"]["PlanningHorizon"]
+    builder = ShardBuilder(horizon["BeginTime"], horizon["EndTime"], shard_hours)
+    for section in ["Tails", "Legs", "Crewmembers", "CrewActivities", "CrewFlyingTogether", "FlightRequests"]:
+        builder.add_many(section, scenario.get(section, []))
+    extra = {k: scenario[k] for k in ("Weather", "Description") if k in scenario}
+    return builder.write(out_dir, extra)
+
+
+def load_shard(out_dir: str, when: str = None, index: int = None) -> dict:
+    """load the shard covering time `when` (or shard number `index`) using the manifest only."""
+    with open(os.path.join(out_dir, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    entry = None
+    if index is not None:
+        entry = manifest["Shards"][index]
+    else:
+        t = to_minutes(when)
+        for e in manifest["Shards"]:
+            if to_minutes(e["BeginTime"]) <= t < to_minutes(e["EndTime"]):
+                entry = e
+                break
+        if entry is None:
+            raise ValueError(f"{when} is outside the sharded planning horizon")
+    with open(os.path.join(out_dir, entry["File"])) as f:
+        return json.load(f)
@@ -0,0 +1,290 @@
+"""Content-addressed store for generated scenarios.
+
+A scenario is fully determined by (factors, seed, generator source, srd.json),
+so scenario_key() hashes exactly that and the store maps key -> the files one
+generate_scenario call produced (scenario + sidecars). A sweep that asks for a
+cell it has already generated gets the files copied (or hard linked) back
+instead of regenerating them.
+
+    store/
+        manifest.sqlite          keys, artifacts, objects, last use
+        objects/ab/abcdef....    one file per distinct content (sha256)
+
+Files are stored by content hash, so identical outputs (same scenario under two
+keys, identical sidecars) are kept once. evict() drops least recently used
+keys until the objects fit in the size budget.
+
+    store = ScenarioStore("scenario_store", max_bytes=20 * 2**30)
+    key = scenario_key(factors, seed, generator_version(__file__), srd_fingerprint("srd.json"))
+    if store.get(key, dest_dir="."): ...            # cache hit: files restored
+    store.put(key, ["scenario_....json", "scenario_....summary.json"], factors=factors, seed=seed)
+"""
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+
+HASH_CHUNK = 1 << 20
+
+_file_hashes = {}   # (abspath, size, mtime_ns) -> sha256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key        TEXT PRIMARY KEY,
+    factors    TEXT,
+    seed       TEXT,
+    created    REAL,
+    last_used  REAL,
+    hits       INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    key        TEXT,
+    name       TEXT,
+    digest     TEXT,
+    PRIMARY KEY (key, name)
+);
+CREATE TABLE IF NOT EXISTS objects (
+    digest     TEXT PRIMARY KEY,
+    size       INTEGER
+);
+CREATE INDEX IF NOT EXISTS artifacts_digest ON artifacts (digest);
+"""
+
+
+# === fingerprints ===
+def file_digest(path: str) -> str:
+    """sha256 of a file, cached per (path, size, mtime)."""
+    st = os.stat(path)
+    cache_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    digest = _file_hashes.get(cache_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                h.update(chunk)
+        digest = _file_hashes[cache_key] = h.hexdigest()
+    return digest
+
+
+def srd_fingerprint(path: str = "srd.json") -> str:
+    return file_digest(path)
+
+
+def generator_version(*sources) -> str:
+    """hash of the generator source: file paths, or modules / functions / classes."""
+    h = hashlib.sha256()
+    paths = sorted({os.path.abspath(s if isinstance(s, str) else inspect.getsourcefile(s)) for s in sources})
+    for path in paths:
+        h.update(os.path.basename(path).encode())
+        h.update(file_digest(path).encode())
+    return h.hexdigest()
+
+
+def _canonical(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return str(value)
+
+
+def factors_digest(factors: dict) -> str:
+    text = json.dumps(factors, sort_keys=True, default=_canonical, separators=(",", ":"))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def scenario_key(factors: dict, seed, generator: str, srd: str) -> str:
+    return factors_digest({"factors": factors, "seed": seed, "generator": generator, "srd": srd})
+
+
+# === store ===
+class ScenarioStore:
+    def __init__(self, root: str = "scenario_store", max_bytes: int = None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(root, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.db_path = os.path.join(root, "manifest.sqlite")
+        with self._db() as db:
+            db.executescript(_SCHEMA)
+
+    def _db(self):
+        # one short-lived connection per operation: safe from writer callback threads
+        db = sqlite3.connect(self.db_path, timeout=30)
+        db.row_factory = sqlite3.Row
+        return _Connection(db)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    # === lookup ===
+    def __contains__(self, key: str) -> bool:
+        with self._db() as db:
+            return db.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone() is not None
+
+    def get(self, key: str, dest_dir: str = None, link: bool = False) -> list:
+        """
+        paths of the stored files for key ([] on a miss). With dest_dir the
+        files are restored there under their original names; link=True hard
+        links instead of copying (the restored files then share the read-only
+        object, so replace them rather than rewriting them in place).
+        """
+        with self._db() as db:
+            rows = db.execute("SELECT name, digest FROM artifacts WHERE key = ? ORDER BY name",
+                              (key,)).fetchall()
+            if not rows:
+                return []
+            db.execute("UPDATE entries SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+        out = []
+        for row in rows:
+            src = self._object_path(row["digest"])
+            if not os.path.exists(src):      # object removed behind our back: treat as a miss
+                self.remove(key)
+                return []
+            if dest_dir is None:
+                out.append(src)
+                continue
+            dest = os.path.join(dest_dir, row["name"])
+            _restore(src, dest, link)
+            out.append(dest)
+        return out
+
+    # === insert ===
+    def put(self, key: str, paths: list, factors: dict = None, seed=None) -> dict:
+        """store the files under key (by basename); return {name: digest}."""
+        digests = {}
+        with self._db() as db:
+            for path in paths:
+                digest = file_digest(path)
+                target = self._object_path(digest)
+                if not os.path.exists(target):
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    tmp = f"{target}.{os.getpid()}.tmp"
+                    shutil.copyfile(path, tmp)
+                    os.chmod(tmp, 0o444)    # objects may be shared by hard links: keep them read-only
+                    os.replace(tmp, target)
+                db.execute("INSERT OR IGNORE INTO objects (digest, size) VALUES (?, ?)",
+                           (digest, os.path.getsize(target)))
+                digests[os.path.basename(path)] = digest
+            now = time.time()
+            db.execute("INSERT OR REPLACE INTO entries (key, factors, seed, created, last_used, hits) "
+                       "VALUES (?, ?, ?, ?, ?, 0)",
+                       (key, json.dumps(factors, sort_keys=True, default=_canonical), _canonical(seed), now, now))
+            db.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+            db.executemany("INSERT INTO artifacts (key, name, digest) VALUES (?, ?, ?)",
+                           [(key, name, digest) for name, digest in digests.items()])
+        self._collect()     # objects only the replaced entry used
+        if self.max_bytes is not None:
+            self.evict(self.max_bytes)
+        return digests
+
+    # === removal ===
+    def remove(self, key: str):
+        with self._db() as db:
+            db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            db.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+        self._collect()
+
+    def _collect(self) -> int:
+        """delete objects no key refers to; return bytes freed."""
+        freed = 0
+        with self._db() as db:
+            orphans = db.execute("SELECT digest, size FROM objects WHERE digest NOT IN "
+                                 "(SELECT digest FROM artifacts)").fetchall()
+            for row in orphans:
+                path = self._object_path(row["digest"])
+                if os.path.exists(path):
+                    os.chmod(path, 0o644)
+                    os.remove(path)
+                freed += row["size"]
+            db.executemany("DELETE FROM objects WHERE digest = ?", [(r["digest"],) for r in orphans])
+        return freed
+
+    def total_bytes(self) -> int:
+        with self._db() as db:
+            return db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+
+    def evict(self, max_bytes: int) -> list:
+        """drop least recently used keys until stored objects fit in max_bytes; return evicted keys."""
+        evicted = []
+        total = self.total_bytes()
+        if total <= max_bytes:
+            return evicted
+        with self._db() as db:
+            keys = [r["key"] for r in db.execute("SELECT key FROM entries ORDER BY last_used")]
+        for key in keys:
+            if total <= max_bytes:
+                break
+            with self._db() as db:
+                db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                db.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+            total -= self._collect()
+            evicted.append(key)
+        return evicted
+
+    def entries(self) -> list:
+        with self._db() as db:
+            return [dict(r) for r in db.execute("SELECT * FROM entries ORDER BY last_used DESC")]
+
+    def stats(self) -> dict:
+        with self._db() as db:
+            n_entries = db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            n_objects, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects").fetchone()
+            n_artifacts = db.execute("SELECT COUNT(*) FROM artifacts").fetchone()[0]
+        return {"entries": n_entries, "artifacts": n_artifacts, "objects": n_objects, "bytes": size,
+                "deduplicated": n_artifacts - n_objects}
+
+
+class _Connection:
+    """sqlite connection as a context manager that commits and closes."""
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.db.commit()
+        finally:
+            self.db.close()
+
+
+def _restore(src: str, dest: str, link: bool = False):
+    if os.path.exists(dest):
+        if os.path.samefile(src, dest):
+            return
+        os.remove(dest)
+    if link:
+        try:
+            os.link(src, dest)
+            return
+        except OSError:     # other file system
+            pass
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dest)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="inspect / trim a scenario store")
+    parser.add_argument("root", nargs="?", default="scenario_store")
+    parser.add_argument("--evict", type=float, metavar="GB", help="evict down to this many GB")
+    parser.add_argument("--list", action="store_true")
+    args = parser.parse_args()
+
+    store = ScenarioStore(args.root)
+    if args.evict is not None:
+        evicted = store.evict(int(args.evict * 2**30))
+        print(f"[+] evicted {len(evicted)} entries")
+    if args.list:
+        for e in store.entries():
+            print(f"{e['key'][:12]}  hits={e['hits']:<4} seed={e['seed']:<12} {e['factors']}")
+    print(f"[+] {store.stats()}")
@@ -0,0 +1,138 @@
+"""Compact per-scenario statistics, accumulated while generate_scenario runs and
+written as a <scenario>.summary.json sidecar, so DOE analysis across hundreds
+of cells reads a few KB per cell instead of reparsing every scenario.
+
+summarize_scenario() builds the summary from an existing scenario in one pass
+(for files generated before the sidecar existed); the event / base request
+split and the factors are not recoverable from the file itself.
+"""
+import glob
+import json
+from collections import Counter
+
+from scenario_common import crew_qualifications, from_minutes, load_scenario, sidecar_path, to_minutes
+
+SUMMARY_SUFFIX = ".summary.json"
+
+
+def summary_path(scenario_filename: str) -> str:
+    return sidecar_path(scenario_filename, SUMMARY_SUFFIX)
+
+
+class ScenarioSummary:
+    def __init__(self, start_time: str, factors: dict = None):
+        self.start_min = to_minutes(start_time)
+        self.factors = dict(factors or {})
+        self.counts = Counter()
+        self.departures = Counter()         # all requests, by DepartureAirport
+        self.base_departures = Counter()    # generator's base_dep_counter (base flight requests only)
+        self.requests_per_hour = Counter()  # hour offset from start_time -> requests
+        self.request_types = Counter()
+        self.tail_types = Counter()
+        self.crew_domiciles = Counter()
+        self.crew_positions = Counter()
+        self.weather = {"Enabled": False}
+        self.event = {"Enabled": False}
+
+    # === accumulate ===
+    def add_request(self, req: dict, kind: str = "FlightRequests"):
+        self.counts[kind] += 1
+        self.departures[req["DepartureAirport"]] += 1
+        self.requests_per_hour[(to_minutes(req["RequestedTime"]) - self.start_min) // 60] += 1
+        self.request_types[req.get("requestedAircraftTypeName")] += 1
+
+    def add_tail(self, tail: dict):
+        self.counts["Tails"] += 1
+        self.tail_types[tail["AircraftTypeName"]] += 1
+
+    def add_crew(self, crew: dict):
+        self.counts["Crewmembers"] += 1
+        self.crew_domiciles[crew.get("AirportIDDomicile")] += 1
+        codes = {q.get("QualificationCode") for q in crew_qualifications(crew)}
+        self.crew_positions["FA" if codes == {"FA"} else "PIC/SIC"] += 1
+
+    def add_many(self, kind: str, records: list):
+        if kind == "Tails":
+            for t in records:
+                self.add_tail(t)
+        elif kind == "Crewmembers":
+            for c in records:
+                self.add_crew(c)
+        else:
+            self.counts[kind] += len(records)
+
+    def set_weather(self, epicenter, affected_airports, affected_tails: int, grounding_legs: list):
+        self.weather = {
+            "Enabled": True,
+            "Epicenter": epicenter,
+            "AffectedAirports": len(affected_airports),
+            "AffectedTails": affected_tails,
+            "GroundedTailMinutes": sum(l.get("Duration", 0) for l in grounding_legs),
+        }
+
+    def set_event(self, epicenter, event_airports, extra_requests: int):
+        self.event = {
+            "Enabled": True,
+            "Epicenter": epicenter,
+            "Airports": len(event_airports),
+            "ExtraRequests": extra_requests,
+        }
+
+    # === output ===
+    def to_dict(self) -> dict:
+        hours = max(self.requests_per_hour) + 1 if self.requests_per_hour else 0
+        first = min(min(self.requests_per_hour, default=0), 0)
+        return {
+            "Factors": self.factors,
+            "Counts": dict(sorted(self.counts.items())),
+            "DeparturesByAirport": dict(self.departures.most_common()),
+            "BaseDeparturesByAirport": dict(self.base_departures.most_common()),
+            # index i = requests in hour (first + i) after start_time
+            "RequestsPerHour": {"FirstHour": first,
+                                "Counts": [self.requests_per_hour.get(h, 0) for h in range(first, hours)]},
+            "AircraftTypeMix": {"Tails": dict(self.tail_types.most_common()),
+                                "FlightRequests": dict(self.request_types.most_common())},
+            "CrewPerDomicile": dict(self.crew_domiciles.most_common()),
+            "CrewByPosition": dict(self.crew_positions),
+            "Weather": self.weather,
+            "Event": self.event,
+        }
+
+    def write(self, scenario_filename: str) -> str:
+        path = summary_path(scenario_filename)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+        return path
+
+
+def summarize_scenario(scenario, factors: dict = None) -> dict:
+    """one-pass summary of an existing scenario (path or dict)."""
+    scenario = load_scenario(scenario)
+    horizon = scenario["Configuration"]["PlanningHorizon"]
+    # generated files start requests one day after the positioning BeginTime
+    start = to_minutes(horizon["BeginTime"]) + 24 * 60
+    summary = ScenarioSummary(from_minutes(start), factors or scenario.get("DOE_Factors"))
+    summary.add_many("Tails", scenario.get("Tails", []))
+    summary.add_many("Crewmembers", scenario.get("Crewmembers", []))
+    for kind in ("Legs", "CrewActivities", "CrewFlyingTogether"):
+        summary.add_many(kind, scenario.get(kind, []))
+    for req in scenario.get("FlightRequests", []):
+        summary.add_request(req, "MaintenanceRequests" if req.get("ActivityType") == "MAINTENANCE"
+                            else "FlightRequests")
+    weather = scenario.get("Weather") or {}
+    if weather.get("Enabled"):
+        affected = set(weather.get("AffectedAirports", []))
+        grounding = [l for l in scenario.get("Legs", []) if l.get("mxType") == "WEATHER_GROUNDED"]
+        summary.set_weather(weather.get("Epicenter"), affected,
+                            sum(1 for t in scenario.get("Tails", []) if t.get("CurrentLocation") in affected),
+                            grounding)
+    return summary.to_dict()
+
+
+def load_summaries(pattern: str = "*" + SUMMARY_SUFFIX) -> dict:
+    """{summary path: summary} for every sidecar matching the glob pattern."""
+    out = {}
+    for path in sorted(glob.glob(pattern)):
+        with open(path) as f:
+            out[path] = json.load(f)
+    return out
@@ -0,0 +1,191 @@
+"""Validate a generated scenario before it is handed to the solver.
+
+Checks referential integrity (legs / activities / requests pointing at tails,
+crews and legs that exist) and temporal consistency (overlapping crew
+activities, overlapping tail legs, tours ending before they start).
+
+Every check is a hash lookup or a per-crew / per-tail sorted sweep, so a
+100k-record scenario is checked well under a second.
+
+usage:
+    python scenario_validator.py scenario_low_high_low_low.json [--json]
+"""
+import argparse
+import json
+import sys
+from collections import defaultdict
+
+from scenario_common import SECTION_KEYS, to_minutes, load_scenario
+
+ERROR = "error"
+WARNING = "warning"
+
+
+def _finding(findings, severity, code, section, index, record_id, message):
+    findings.append({
+        "severity": severity,
+        "code": code,
+        "section": section,
+        "index": index,
+        "id": record_id,
+        "message": message,
+    })
+
+
+# === indexes ===
+def build_id_index(records: list, key: str, section: str, findings: list) -> dict:
+    """id -> position in list, reporting duplicates on the way."""
+    index = {}
+    for i, rec in enumerate(records):
+        rid = rec.get(key)
+        if rid is None:
+            _finding(findings, ERROR, "MISSING_ID", section, i, None, f"record has no {key}")
+            continue
+        if rid in index:
+            _finding(findings, ERROR, "DUPLICATE_ID", section, i, rid,
+                     f"{key} {rid} already used by record #{index[rid]}")
+            continue
+        index[rid] = i
+    return index
+
+
+def _sweep_overlaps(intervals_by_owner: dict, section: str, code: str, findings: list):
+    """
+    intervals_by_owner: owner -> [(start_min, end_min, record_index, record_id)]
+    sort each owner's intervals and report every interval starting before the
+    furthest end seen so far.
+    """
+    for owner, intervals in intervals_by_owner.items():
+        if len(intervals) < 2:
+            continue
+        intervals.sort()
+        reach_end, reach_idx, reach_id = intervals[0][1], intervals[0][2], intervals[0][3]
+        for start, end, idx, rid in intervals[1:]:
+            if start < reach_end:
+                _finding(findings, ERROR, code, section, idx, rid,
+                         f"{owner}: overlaps record #{reach_idx} ({reach_id}) by {reach_end - start} min")
+            if end > reach_end:
+                reach_end, reach_idx, reach_id = end, idx, rid
+
+
+# === checks ===
+def validate_scenario(scenario, check_overlaps: bool = True) -> list:
+    """return a list of findings (dicts); empty list means the scenario is clean."""
+    scenario = load_scenario(scenario)
+    findings = []
+
+    tails = scenario.get("Tails", [])
+    crews = scenario.get("Crewmembers", [])
+    legs = scenario.get("Legs", [])
+    requests = scenario.get("FlightRequests", [])
+    activities = scenario.get("CrewActivities", [])
+    fly_together = scenario.get("CrewFlyingTogether", [])
+
+    tail_index = build_id_index(tails, SECTION_KEYS["Tails"], "Tails", findings)
+    crew_index = build_id_index(crews, SECTION_KEYS["Crewmembers"], "Crewmembers", findings)
+    leg_index = build_id_index(legs, SECTION_KEYS["Legs"], "Legs", findings)
+    build_id_index(requests, SECTION_KEYS["FlightRequests"], "FlightRequests", findings)
+
+    # --- crew tours ---
+    for i, c in enumerate(crews):
+        start, end = c.get("tourStartDate"), c.get("tourEndDate")
+        if start and end and to_minutes(end) < to_minutes(start):
+            _finding(findings, ERROR, "TOUR_ENDS_BEFORE_START", "Crewmembers", i, c.get("CrewmemberID"),
+                     f"tourEndDate {end} is before tourStartDate {start}")
+
+    # --- legs ---
+    crew_legs = defaultdict(set)        # crew id -> leg ids it is assigned to
+    tail_intervals = defaultdict(list)
+    for i, leg in enumerate(legs):
+        leg_id = leg.get("LegID")
+        tail = leg.get("TailNumber")
+        if tail not in tail_index:
+            _finding(findings, ERROR, "UNKNOWN_TAIL", "Legs", i, leg_id, f"TailNumber {tail} not in Tails")
+        for ac in leg.get("AssignedCrewmembers", []):
+            cid = ac.get("CrewmemberID")
+            crew_legs[cid].add(leg_id)
+            if cid not in crew_index:
+                _finding(findings, ERROR, "UNKNOWN_CREW", "Legs", i, leg_id,
+                         f"AssignedCrewmembers references CrewmemberID {cid} not in Crewmembers")
+        if leg.get("Duration", 0) < 0:
+            _finding(findings, ERROR, "NEGATIVE_DURATION", "Legs", i, leg_id, f"Duration {leg['Duration']}")
+        if check_overlaps and "StartTime" in leg:
+            start = to_minutes(leg["StartTime"])
+            tail_intervals[tail].append((start, start + leg.get("Duration", 0), i, leg_id))
+
+    # --- crew activities ---
+    crew_intervals = defaultdict(list)
+    for i, act in enumerate(activities):
+        cid = act.get("CrewmemberID")
+        leg_id = act.get("LegID")
+        if cid not in crew_index:
+            _finding(findings, ERROR, "UNKNOWN_CREW", "CrewActivities", i, cid,
+                     f"CrewmemberID {cid} not in Crewmembers")
+        if "TailNumber" in act and act["TailNumber"] not in tail_index:
+            _finding(findings, ERROR, "UNKNOWN_TAIL", "CrewActivities", i, cid,
+                     f"TailNumber {act['TailNumber']} not in Tails")
+        if leg_id is not None:
+            crew_legs[cid].add(leg_id)
+            if leg_id not in leg_index:
+                _finding(findings, WARNING, "UNKNOWN_LEG", "CrewActivities", i, cid,
+                         f"LegID {leg_id} not in Legs")
+        if act.get("Duration", 0) < 0:
+            _finding(findings, ERROR, "NEGATIVE_DURATION", "CrewActivities", i, cid, f"Duration {act['Duration']}")
+        if check_overlaps and "StartTime" in act:
+            start = to_minutes(act["StartTime"])
+            crew_intervals[cid].append((start, start + act.get("Duration", 0), i, act.get("ActivityType")))
+
+    # --- maintenance requests ---
+    for i, req in enumerate(requests):
+        required = req.get("RequiredTail")
+        if required is not None and required not in tail_index:
+            _finding(findings, ERROR, "UNKNOWN_TAIL", "FlightRequests", i, req.get("RequestID"),
+                     f"RequiredTail {required} not in Tails")
+
+    # --- crews flying together ---
+    for i, pair in enumerate(fly_together):
+        members = pair.get("Crewmembers", [])
+        missing = [m for m in members if m not in crew_index]
+        if missing:
+            _finding(findings, ERROR, "UNKNOWN_CREW", "CrewFlyingTogether", i, members,
+                     f"members {missing} not in Crewmembers")
+            continue
+        if len(members) < 2:
+            continue
+        shared = set.intersection(*(crew_legs.get(m, set()) for m in members))
+        if not shared:
+            _finding(findings, WARNING, "NO_SHARED_LEG", "CrewFlyingTogether", i, members,
+                     "pair does not share any leg")
+
+    # --- temporal overlaps ---
+    if check_overlaps:
+        _sweep_overlaps(tail_intervals, "Legs", "TAIL_LEG_OVERLAP", findings)
+        _sweep_overlaps(crew_intervals, "CrewActivities", "CREW_ACTIVITY_OVERLAP", findings)
+
+    return findings
+
+
+def summarize(findings: list) -> dict:
+    """finding count per (severity, code)."""
+    counts = defaultdict(int)
+    for f in findings:
+        counts[f"{f['severity']}:{f['code']}"] += 1
+    return dict(sorted(counts.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="validate a generated scenario json")
+    parser.add_argument("scenario")
+    parser.add_argument("--json", action="store_true", help="print findings as json lines")
+    parser.add_argument("--no-overlaps", action="store_true", help="skip the interval sweeps")
+    args = parser.parse_args()
+
+    findings = validate_scenario(args.scenario, check_overlaps=not args.no_overlaps)
+    if args.json:
+        for f in findings:
+            print(json.dumps(f))
+    else:
+        for code, n in summarize(findings).items():
+            print(f"[-] {code}: {n}")
+        print(f"[+] {len(findings)} findings in {args.scenario}")
+    sys.exit(1 if any(f["severity"] == ERROR for f in findings) else 0)
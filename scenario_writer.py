@@ -0,0 +1,145 @@
+"""Background scenario writer: overlap generation of the next DOE cell with
+serialization, compression and disk I/O of the previous one.
+
+    with ScenarioWriter(max_workers=2, compression="gzip") as writer:
+        for exp in experiments:
+            generate_scenario(**exp, writer=writer)
+
+submit() hands the scenario to a worker pool and returns a Future; it blocks
+once `max_pending` scenarios are queued (backpressure, so a fast generator
+cannot pile up dozens of multi-MB dicts in memory). Every file is written to a
+temp name in the target directory and renamed on completion, so a crashed or
+interrupted sweep never leaves a half-written scenario behind.
+
+use_processes=True serializes in worker processes instead of threads: json
+encoding holds the GIL, compression and disk writes don't, so threads overlap
+I/O and compression while processes also overlap encoding (at the cost of
+pickling the scenario over).
+"""
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import zstandard
+except ImportError:     # optional, only needed for compression="zstd"
+    zstandard = None
+
+COMPRESSION_SUFFIX = {None: "", "gzip": ".gz", "zstd": ".zst"}
+WRITE_BUFFER = 1 << 20
+
+
+def output_path(filename: str, compression=None) -> str:
+    if compression not in COMPRESSION_SUFFIX:
+        raise ValueError(f"Invalid compression: {compression}")
+    suffix = COMPRESSION_SUFFIX[compression]
+    return filename if filename.endswith(suffix) else filename + suffix
+
+
+def _open_compressed(raw, compression, level, name):
+    if compression == "gzip":
+        # fixed name/mtime in the header: same scenario -> byte-identical file
+        return gzip.GzipFile(filename=name, fileobj=raw, mode="wb", compresslevel=level or 6, mtime=0)
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("compression='zstd' needs the zstandard package")
+        return zstandard.ZstdCompressor(level=level or 3).stream_writer(raw, closefd=False)
+    return raw
+
+
+def write_scenario(scenario: dict, filename: str, compression=None, indent=2, level=None) -> str:
+    """stream scenario json to filename (+ .gz/.zst) atomically; return the final path."""
+    final = output_path(filename, compression)
+    directory = os.path.dirname(os.path.abspath(final))
+    tmp = os.path.join(directory, f".{os.path.basename(final)}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "wb", buffering=WRITE_BUFFER) as raw:
+            stream = _open_compressed(raw, compression, level, os.path.basename(final))
+            text = io.TextIOWrapper(stream, encoding="utf-8", write_through=False)
+            # iterencode + a large buffered wrapper: chunks are streamed to the
+            # compressor instead of building the whole document in memory
+            for chunk in json.JSONEncoder(indent=indent).iterencode(scenario):
+                text.write(chunk)
+            text.flush()
+            text.detach()
+            if stream is not raw:
+                stream.close()
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp, final)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return final
+
+
+class ScenarioWriter:
+    def __init__(self, max_workers: int = 2, max_pending: int = None, compression=None,
+                 indent=2, level=None, use_processes: bool = False):
+        output_path("x", compression)   # validate early, not in a worker
+        if compression == "zstd" and zstandard is None:
+            raise RuntimeError("compression='zstd' needs the zstandard package")
+        self.compression = compression
+        self.indent = indent
+        self.level = level
+        pool = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self._pool = pool(max_workers=max_workers)
+        self._slots = threading.BoundedSemaphore(max_pending or max_workers * 2)
+        self._lock = threading.Lock()
+        self._futures = []
+        self.stats = {"submitted": 0, "written": 0, "failed": 0, "bytes": 0,
+                      "blocked_seconds": 0.0}
+
+    def submit(self, scenario: dict, filename: str, on_done=None):
+        """queue scenario for writing; blocks while max_pending writes are in flight."""
+        t0 = time.perf_counter()
+        self._slots.acquire()
+        self.stats["blocked_seconds"] += time.perf_counter() - t0
+        try:
+            future = self._pool.submit(write_scenario, scenario, filename,
+                                       self.compression, self.indent, self.level)
+        except BaseException:
+            self._slots.release()
+            raise
+        self.stats["submitted"] += 1
+
+        def _finished(fut):
+            self._slots.release()
+            with self._lock:
+                if fut.exception() is not None:
+                    self.stats["failed"] += 1
+                    print(f"[-] writing {filename} failed: {fut.exception()!r}")
+                    return
+                self.stats["written"] += 1
+                self.stats["bytes"] += os.path.getsize(fut.result())
+            if on_done is not None:
+                on_done(fut.result())
+
+        future.add_done_callback(_finished)
+        self._futures.append(future)
+        return future
+
+    def wait(self) -> list:
+        """block until everything submitted so far is on disk; return the paths (raises on failure)."""
+        futures, self._futures = self._futures, []
+        return [f.result() for f in futures]
+
+    def close(self, wait: bool = True):
+        try:
+            if wait:
+                self.wait()
+        finally:
+            self._pool.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # on error still let queued writes finish so nothing is left as a temp file
+        self.close(wait=True)
+        return False
@@ -1,12 +1,27 @@
 import json
+import os
 import random
 from datetime import datetime, timedelta
 from collections import Counter
 from math import radians, sin, cos, sqrt, atan2
 import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+
+from availability_timeline import AvailabilityIndex
+from crew_bitsets import CrewQualIndex, write_eligibility_index
+from route_table import RouteTable
+from scenario_hardness import analyze_scenario, write_hardness
+from scenario_common import EPOCH, to_minutes
+from scenario_shards import ShardBuilder
+from scenario_store import ScenarioStore, factors_digest, generator_version, scenario_key, srd_fingerprint
+from scenario_summary import ScenarioSummary
+from scenario_writer import ScenarioWriter
 
 # === Step 1. read in all airports latitude and longtitude ===
-with open("srd.json", "r", encoding="utf-8") as f:
+# SRD_PATH can point at a synthetic fixture (make_srd_fixture.py) for offline runs
+SRD_PATH = os.environ.get("SRD_PATH", "srd.json")
+with open(SRD_PATH, "r", encoding="utf-8") as f:
     full_data = json.load(f)
 all_airport_coords = {}
 all_us_airports = []
@@ -25,6 +40,17 @@ routingCache = full_data["StaticRoutingData"]["RoutingCache"]
 airports = routingCache["Airports"]
 aircrafts = routingCache["AircraftTypeNames"]
 routes = routingCache["Routes"]
+# (origin, destination, type) -> block minutes, distance/speed estimate when no route is cached;
+# built before the loop below removes airports, in case routes refer to airports by index
+route_table = RouteTable(routes, all_airport_coords, airport_names=airports, aircraft_names=aircrafts)
+if routes and not route_table.routes:
+    raise ValueError(f"none of the {len(routes)} RoutingCache routes in {SRD_PATH} could be read "
+                     f"(unrecognized route fields: {routes[0]!r})")
+if route_table.skipped_routes:
+    print(f"[-] Skipped {route_table.skipped_routes}/{len(routes)} routes with unrecognized fields; "
+          f"those legs use distance estimates.")
+elif not routes:
+    print(f"[-] {SRD_PATH} has no RoutingCache routes; all leg durations are distance estimates.")
 
 cache_airport_coords = {}
 us_airports = []
@@ -160,18 +186,18 @@ def generate_allowed_tailtypes_FA(allowed_tailtypes):
     return rand_allowed_tailtypes
 
 # ====================== Bruce ======================
-def generate_crewmembers(crewmember_level, allowed_tailtypes, airports, start_time, time_window_days):
+crew_level_map = {"low": 1500, "mid": 2000, "high": 2500}
+
+def generate_crewmembers(crewmember_level, allowed_tailtypes, airports, start_time, time_window_days, num_crews=None):
     crews = []
     # positions = ["PIC", "SIC"]
-    if crewmember_level == "low":
-        num_crews = 1500
-    elif crewmember_level == "mid":
-        num_crews = 2000
-    elif crewmember_level == "high":
-        num_crews = 2500
-    else:
-        print("Invalid crewmember_level, defaulting to low (2000 crews)")
-        num_crews = 2000
+    # num_crews given explicitly -> one block of a parallel run
+    if num_crews is None:
+        if crewmember_level in crew_level_map:
+            num_crews = crew_level_map[crewmember_level]
+        else:
+            print("Invalid crewmember_level, defaulting to low (2000 crews)")
+            num_crews = 2000
     
     for cid in range(1, num_crews + 1):
         crew_id = crewID_start + cid
@@ -237,6 +263,7 @@ def pair_2_members_with_rev_flight(crew1, crew2, rev_start_time, airport_coords,
     tailID = str(tailID_start + len(tails) + 1)
     chosen_type = random.choice(crew1["CrewmemberQualifications"])["AircraftTypeName"]
     tail_avai_time = (activity_start - timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ")  # available 1 day before activity start
+    duration = route_table.block_time(dep_airport, arr_airport, chosen_type)
 
     # Leg attributes
     LegID = legID_start + len(legs) + 1
@@ -266,7 +293,7 @@ def pair_2_members_with_rev_flight(crew1, crew2, rev_start_time, airport_coords,
         "OriginAirport": dep_airport,
         "DestinationAirport": arr_airport,
         "StartTime": activity_start.strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "Duration": 120,  # assume 2 hours flight
+        "Duration": duration,  # RoutingCache block time (or distance estimate)
         "AssignedCrewmembers": [
             {
                 "CrewmemberID": crew1_id,
@@ -290,7 +317,7 @@ def pair_2_members_with_rev_flight(crew1, crew2, rev_start_time, airport_coords,
         "OriginAirport": dep_airport,
         "DestinationAirport": arr_airport,
         "StartTime": activity_start.strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "Duration": 120
+        "Duration": duration
     })
     # crew2 Rev Flight
     crew_activities.append({
@@ -303,7 +330,7 @@ def pair_2_members_with_rev_flight(crew1, crew2, rev_start_time, airport_coords,
         "OriginAirport": dep_airport,
         "DestinationAirport": arr_airport,
         "StartTime": activity_start.strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "Duration": 120
+        "Duration": duration
     })
 
     # list doesn't have to be returned
@@ -480,6 +507,8 @@ def generate_crew_activities(crews, airports, airport_coords, start_time, legs=[
 
 
         # ==== Replacing some crwe2's attr with crew1's ====
+        # (crew2 takes crew1's qualifications, so no qualified-crew lookup happens here:
+        #  CrewQualIndex is only used for the eligibility sidecar / hardness)
         crew2["tourStartDate"] = crew1["tourStartDate"]
         crew2["tourEndDate"] = crew1["tourEndDate"]
         crew2["CurrentLocation"] = crew1["CurrentLocation"]
@@ -548,6 +577,249 @@ def pick_2_random_airports_for_req(pool1, pool2):
     return dep, arr
 
 
+def generate_flight_requests(num_requests, id_start, num_hub_reqs, airports, nearby_airports, allowed_tailtypes,
+                             geo_density, hub_pattern, substitutes, window_start, window_minutes):
+    """revenue flight requests with RequestID id_start+1.. and RequestedTime in [window_start, +window_minutes]."""
+    requests = []
+    for rid in range(1, num_requests + 1):
+        # --- Determine if request belongs to hub or random region ---
+        is_hub_request = (geo_density == "high" and rid <= num_hub_reqs and nearby_airports)
+
+        # --- Generate departure & arrival based on hub pattern ---
+        if is_hub_request:
+            if hub_pattern == "fly_out":
+                dep, arr = pick_2_random_airports_for_req(nearby_airports, airports)
+
+            elif hub_pattern == "fly_in":
+                arr, dep = pick_2_random_airports_for_req(nearby_airports, airports)
+                
+            else:  # "fly_io" = fly between hubs (hub↔hub)
+                rd_num = random.random()
+                # 1/3 chance for each of the 3 patterns
+                if rd_num < 1/3.0:
+                    dep, arr = pick_2_random_airports_for_req(nearby_airports, airports)
+                elif rd_num < 2/3.0:
+                    arr, dep = pick_2_random_airports_for_req(nearby_airports, airports)
+                else:
+                    dep, arr = random.sample(nearby_airports,2)
+                    
+
+        else:
+            # Random region (low density or 10% random in high density)
+            arr, dep = pick_2_random_airports_for_req(airports, airports)
+
+        '''Season conflict with geo density, skip for now, fix in future version
+        # === choose arrival airport with seasonal bias ===
+        if season in ["winter", "fall"]:
+            if random.random() < prob_south_bias and south_airports:  # 30% chance to go south
+                candidate_pool = [a for a in south_airports if a in airports and a != dep]
+            else:  # 70% random
+                candidate_pool = [a for a in airports if a != dep]
+        else:  # spring/summer
+            if random.random() < prob_north_bias and north_airports:  # 30% chance to go north
+                candidate_pool = [a for a in north_airports if a in airports and a != dep]
+            else:
+                candidate_pool = [a for a in airports if a != dep]
+
+        if not candidate_pool:
+            candidate_pool = [a for a in airports if a != dep]
+
+        arr = random.choice(candidate_pool)'''
+
+        req_time = window_start + timedelta(minutes=random.randint(0, window_minutes))
+        req_id = id_start + rid
+        jet_type = random.choice(allowed_tailtypes)["AircraftTypeName"]
+
+        # AllowedTailTypes
+        if substitutes == 0:
+            allowed_types = [{"AircraftTypeName": jet_type, "Penalty": 0}]
+        else:
+            other_types = [t for t in allowed_tailtypes if t["AircraftTypeName"] != jet_type]
+            sampled_types = random.sample(other_types, 4)
+            allowed_types = [{"AircraftTypeName": jet_type, "Penalty": 0}] + sampled_types
+
+        # === Required FA crewmember positions ===
+        big_planes = ["CL-650S", "GL5500", "CE-700", "GL6000S", "CE-680AS"]
+
+        # base crew positions (always PIC + SIC)
+        crewmember_req = [
+            {"PositionInCrew": "PIC", "CrewmemberRequiredProperties": [], "CrewmemberRestrictedProperties": []},
+            {"PositionInCrew": "SIC", "CrewmemberRequiredProperties": [], "CrewmemberRestrictedProperties": []},
+        ]
+
+        # # 20% chance to add FA if jet is a big plane
+        # if jet_type in big_planes and random.random() < 0.2:
+        #     crewmember_req.append(
+        #         {"PositionInCrew": "FA", "CrewmemberRequiredProperties": [], "CrewmemberRestrictedProperties": []},
+        #     )
+
+        # === consruct request ===  
+        req = {
+            "RequestID": req_id,
+            "ArrivalAirport": arr,
+            "DepartureAirport": dep,
+            "ActivityType": "OPERATE_REVENUE_FLIGHT",
+            "RequestedTime": req_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "RequiredCrewmemberPositions": crewmember_req,
+            "AllowedTailTypes": allowed_types,
+            "requestedAircraftTypeName": jet_type,
+            "TailRequiredProperties": []
+        }
+        requests.append(req)
+    return requests
+
+
+def generate_mx_requests(mx_count, id_start, mx_airport, tails, availability, window_start, window_minutes):
+    """maintenance requests on `tails`, placed in free slots of `availability` (which is updated)."""
+    requests = []
+    for mx_id in range(mx_count):
+        dep = random.choice(mx_airport)
+        arr = dep
+        req_time = window_start + timedelta(minutes=random.randint(0, window_minutes))
+        service_time = random.randint(4, 24)*60  # maintenance time between 4 hours to 24 hours
+        req_id = id_start + mx_id
+        # pick a tail that is free for the whole service window; if a few picks all
+        # conflict, move the request to the last pick's next free slot
+        req_min = to_minutes(req_time.strftime("%Y-%m-%dT%H:%M:%SZ"))
+        for _ in range(10):
+            required_tail_obj = random.choice(tails)
+            if availability.tails.is_free_between(required_tail_obj["TailNumber"], req_min, req_min + service_time):
+                break
+        else:
+            req_min = availability.tails.next_free(required_tail_obj["TailNumber"], req_min, service_time)
+            req_time = EPOCH + timedelta(minutes=req_min)
+        required_tail = required_tail_obj["TailNumber"]
+        jet_type = required_tail_obj["AircraftTypeName"]
+
+        requests.append({
+            "RequestID": req_id,
+            "RequiredTail": required_tail,
+            "ArrivalAirport": arr,
+            "DepartureAirport": dep,
+            "ActivityType": "MAINTENANCE",
+            "RequestedTime": req_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "ServiceTime": service_time,
+            "AllowedTailTypes": [{"AircraftTypeName": jet_type, "Penalty": 0}],
+            "requestedAircraftTypeName": jet_type,
+            "TailRequiredProperties": []
+        })
+        availability.add_maintenance(requests[-1])
+    return requests
+
+
+# ====================== parallel generation ======================
+# A run with workers=N is split into crew blocks, request days and maintenance
+# batches. Each chunk gets a reserved ID block (the ID globals are pointed at it
+# while the chunk runs) and its own random stream seeded from "seed:kind:k", and
+# results are merged in chunk order, so the scenario depends only on the seed,
+# not on N or on which worker ran what. Any run with a seed takes this path
+# (workers=None runs the chunks in-process), so serial and parallel runs of a
+# seed are identical; only unseeded serial runs use the single random stream.
+CREW_CHUNK_SIZE = 500       # crews per block (+10% FA, + dummy partners)
+CREW_ID_BLOCK = 10_000
+TAIL_ID_BLOCK = 10_000      # block k uses tailID_start + (k+1) * TAIL_ID_BLOCK, clear of the fleet tails
+LEG_ID_BLOCK = 100_000
+REQ_ID_BLOCK = 40_000       # one block per day
+MX_BATCHES = 4
+MX_ID_BLOCK = 10_000
+
+
+def _request_id_bases(time_window_days):
+    """first maintenance / event RequestID of a chunked run: past the last per-day request block,
+    which passes mxID_start from about 19 days on."""
+    mx_base = max(mxID_start, flightID_start + time_window_days * REQ_ID_BLOCK)
+    return mx_base, mx_base + MX_BATCHES * MX_ID_BLOCK
+
+
+@contextmanager
+def _chunk_pool(workers):
+    """a process pool for workers > 1 (None: chunks run in-process); shut down even if a chunk fails."""
+    if workers is None or workers <= 1:
+        yield None
+        return
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        yield pool
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+@contextmanager
+def _chunk_context(seed, kind, k, **id_globals):
+    """seed chunk k's random stream and point the ID globals at its block; restored afterwards."""
+    g = globals()
+    saved = {name: g.get(name) for name in id_globals}
+    saved_state = random.getstate()
+    g.update(id_globals)
+    random.seed(f"{seed}:{kind}:{k}")
+    try:
+        yield
+    finally:
+        g.update(saved)
+        random.setstate(saved_state)
+
+
+def _crew_chunk(seed, k, num_crews, allowed_tailtypes, airports, airport_coords, start_time, time_window_days,
+                maintenance_ranges):
+    with _chunk_context(seed, "crew", k,
+                        crewID_start=crewID_start + k * CREW_ID_BLOCK,
+                        tailID_start=tailID_start + (k + 1) * TAIL_ID_BLOCK,
+                        legID_start=legID_start + k * LEG_ID_BLOCK,
+                        min_left_range=maintenance_ranges[0],
+                        cycle_left_range=maintenance_ranges[1]):
+        legs, tails = [], []
+        crews = generate_crewmembers(None, allowed_tailtypes, airports, start_time, time_window_days, num_crews=num_crews)
+        crew_activities, crew_fly_together = generate_crew_activities(crews, airports, airport_coords, start_time, legs, tails)
+    return crews, crew_activities, crew_fly_together, legs, tails
+
+
+def _request_chunk(seed, d, num_requests, num_hub_reqs, airports, nearby_airports, allowed_tailtypes,
+                   geo_density, hub_pattern, substitutes, day_start):
+    with _chunk_context(seed, "requests", d):
+        return generate_flight_requests(num_requests, flightID_start + d * REQ_ID_BLOCK, num_hub_reqs, airports,
+                                        nearby_airports, allowed_tailtypes, geo_density, hub_pattern, substitutes,
+                                        day_start, 24 * 60)
+
+
+def _mx_chunk(seed, b, mx_base, mx_count, mx_airport, tails, legs, window_start, window_minutes):
+    with _chunk_context(seed, "mx", b):
+        availability = AvailabilityIndex()
+        availability.add_legs(legs)
+        return generate_mx_requests(mx_count, mx_base + b * MX_ID_BLOCK, mx_airport, tails, availability,
+                                    window_start, window_minutes)
+
+
+def _submit_chunks(pool, fn, arg_list):
+    """futures when there is a pool, otherwise the chunks run right here, in order."""
+    if pool is None:
+        return [fn(*args) for args in arg_list]
+    return [pool.submit(fn, *args) for args in arg_list]
+
+
+def _chunk_results(chunks):
+    return [c.result() if isinstance(c, Future) else c for c in chunks]
+
+
+# === Scenario store ===
+# the code that shapes a scenario; any edit to it invalidates stored scenarios
+# (the sidecar code too: CrewQualIndex covers write_eligibility_index, analyze_scenario the hardness file)
+GENERATOR_VERSION = generator_version(__file__, AvailabilityIndex, CrewQualIndex, RouteTable, analyze_scenario,
+                                      to_minutes, ShardBuilder, ScenarioSummary, ScenarioWriter)
+STORE_MAX_BYTES = 20 * 2**30
+HARDNESS_RADIUS_MILES = 100     # "nearby" tails for the hardness metrics
+
+
+def scenario_filename(factors: dict, seed=None) -> str:
+    """readable factor levels + a digest of all factors, so cells that differ only in
+    weather / event / hub_pattern / ... no longer overwrite each other; seeded
+    replicates of a cell get _s<seed>, like their store keys."""
+    f = factors
+    tags = "".join(tag for tag, on in (("_weather", f["weather"]), ("_event", f["event"])) if on)
+    replicate = f"_s{seed}" if seed is not None else ""
+    return (f"scenario_{f['arrival_rate']}_{f['geo_density']}_{f['tail_scale']}_{f['maintenance_cycle']}"
+            f"_{f['hub_pattern']}{tags}_{factors_digest(f)[:8]}{replicate}.json")
+
+
 # === DOE factors ===
 def generate_scenario(
     area="US",
@@ -563,10 +835,37 @@ def generate_scenario(
     maintenance_cycle="low",
     start_time=datetime(2025, 4, 1, 6, 0, 0),
     season="Winter",     # input season is more intuitive
-    hub_pattern = "fly_out"
+    hub_pattern = "fly_out",
+    shard_hours=None,    # e.g. 24 -> one shard per day + manifest instead of one big file
+    writer=None,         # ScenarioWriter: write in the background instead of blocking here
+    eligibility_index=False,    # also write <scenario>.eligibility.json (request -> qualified crews)
+    hardness=False,      # also write <scenario>.hardness.json (feasible tails / crews per request)
+    seed=None,           # same seed -> same scenario (default: current time)
+    workers=None,        # N -> generate crew blocks / request days / mx batches in N processes
+    store=None           # ScenarioStore: reuse the files of an earlier call with the same factors/seed/srd
 ):
-    
-    random.seed(time.time())
+    # every argument that shapes the scenario; workers don't: seeded runs are always
+    # chunked, so a seed gives the same output for any workers, and unseeded runs aren't stored
+    factors = {k: v for k, v in locals().items()
+               if k not in ("shard_hours", "writer", "eligibility_index", "hardness", "seed", "workers", "store")}
+    filename = scenario_filename(factors, seed)
+
+    # only seeded runs are stored: those always take the chunked path, so serial and
+    # parallel runs of a seed share a filename and a key because their output is the same
+    store_key = None
+    if store is not None and seed is not None and shard_hours is None:
+        store_key = scenario_key({**factors, "eligibility_index": eligibility_index, "hardness": hardness,
+                                  "compression": getattr(writer, "compression", None)},
+                                 seed, GENERATOR_VERSION, srd_fingerprint(SRD_PATH))
+        restored = store.get(store_key, dest_dir=os.path.dirname(filename) or ".")
+        if restored:
+            print(f"♻️ {', '.join(restored)} restored from {store.root} (key {store_key[:12]})")
+            return
+
+    chunked = workers is not None or seed is not None
+    if seed is None:
+        seed = time.time()
+    random.seed(seed)
 
     weather_affected_airports = set()
     # remove weather airports at the beginning, so that no one request to/from there
@@ -709,14 +1008,71 @@ def generate_scenario(
 
 
     
+    # === summary sidecar: statistics accumulated in the same pass as generation ===
+    summary = ScenarioSummary(start_time.strftime("%Y-%m-%dT%H:%M:%SZ"), factors={
+        "area": area, "arrival_rate": arrival_rate, "substitutes": substitutes, "tail_scale": tail_scale,
+        "maintenance_scale": maintenance_scale, "maintenance_airport_distribution": maintenance_airport_distribution,
+        "geo_density": geo_density, "time_window_days": time_window_days, "weather": weather, "event": event,
+        "maintenance_cycle": maintenance_cycle, "start_time": start_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "season": season, "hub_pattern": hub_pattern,
+    })
+
+    # === time-sharded output: bucket records by window while generating ===
+    sharder = None
+    if shard_hours:
+        sharder = ShardBuilder((start_time + timedelta(days=-1)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                               (start_time + timedelta(days=time_window_days)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                               shard_hours)
+
     # ====================== Bruce ======================
 
     # === generate crew members if crew_included ===
     tails = []
     legs = []
-    if crew_included:
+    num_requests_per_day = num_requests // time_window_days
+    if chunked:
+        num_crews = crew_level_map.get(crewmember_level, 2000)
+        crew_args = [(seed, k, min(CREW_CHUNK_SIZE, num_crews - k * CREW_CHUNK_SIZE), allowed_tailtypes, airports,
+                      airport_coords, start_time, time_window_days, (min_left_range, cycle_left_range))
+                     for k in range((num_crews + CREW_CHUNK_SIZE - 1) // CREW_CHUNK_SIZE)] if crew_included else []
+        # request days don't depend on crews or tails, so they run alongside the crew blocks
+        request_args = [(seed, d, num_requests_per_day,
+                         int(0.1 * num_requests_per_day) if geo_density == "high" else 0,
+                         airports, nearby_airports, allowed_tailtypes, geo_density, hub_pattern, substitutes,
+                         start_time + timedelta(days=d))
+                        for d in range(time_window_days)]
+        with _chunk_pool(workers) as pool:
+            crew_chunks = _submit_chunks(pool, _crew_chunk, crew_args)
+            request_chunks = _submit_chunks(pool, _request_chunk, request_args)
+            crew_chunks, request_chunks = _chunk_results(crew_chunks), _chunk_results(request_chunks)
+        if crew_included:
+            crews, crew_activities, crew_fly_together = [], [], []
+            for chunk_crews, chunk_activities, chunk_fly, chunk_legs, chunk_tails in crew_chunks:
+                crews.extend(chunk_crews)
+                crew_activities.extend(chunk_activities)
+                crew_fly_together.extend(chunk_fly)
+                legs.extend(chunk_legs)
+                tails.extend(chunk_tails)
+    elif crew_included:
         crews = generate_crewmembers(crewmember_level, allowed_tailtypes, airports, start_time, time_window_days)
         crew_activities, crew_fly_together = generate_crew_activities(crews, airports, airport_coords, start_time, legs, tails)
+    if crew_included:
+        # qualifications as per-position bitmasks over allowed_tailtypes; built after
+        # generate_crew_activities because it adds dummy crews and copies crew1's quals to crew2
+        qual_index = CrewQualIndex(allowed_tailtypes)
+        qual_index.add_many(crews)
+    # busy intervals per tail / crew, kept up to date as activities are placed
+    availability = AvailabilityIndex()
+    availability.add_legs(legs)
+    if crew_included:
+        availability.add_crew_activities(crew_activities)
+        summary.add_many("Crewmembers", crews)
+        summary.add_many("CrewActivities", crew_activities)
+        summary.add_many("CrewFlyingTogether", crew_fly_together)
+        if sharder is not None:
+            sharder.add_many("Crewmembers", crews)
+            sharder.add_many("CrewActivities", crew_activities)
+            sharder.add_many("CrewFlyingTogether", crew_fly_together)
 
     # ====================== Bruce ======================
 
@@ -753,6 +1109,9 @@ def generate_scenario(
             # "paxSeats": random.choice([8, 10, 12]),
             # "lavSeats": random.choice([0, 1]),
         })
+    summary.add_many("Tails", tails)
+    if sharder is not None:
+        sharder.add_many("Tails", tails)
 
 
 
@@ -773,118 +1132,45 @@ def generate_scenario(
     
     print(f"🧭 Hub traffic pattern: {hub_pattern}")
 
-    for rid in range(1, num_requests + 1):
-        # --- Determine if request belongs to hub or random region ---
-        is_hub_request = (geo_density == "high" and rid <= num_hub_reqs and nearby_airports)
-
-        # --- Generate departure & arrival based on hub pattern ---
-        if is_hub_request:
-            if hub_pattern == "fly_out":
-                dep, arr = pick_2_random_airports_for_req(nearby_airports, airports)
-
-            elif hub_pattern == "fly_in":
-                arr, dep = pick_2_random_airports_for_req(nearby_airports, airports)
-                
-            else:  # "fly_io" = fly between hubs (hub↔hub)
-                rd_num = random.random()
-                # 1/3 chance for each of the 3 patterns
-                if rd_num < 1/3.0:
-                    dep, arr = pick_2_random_airports_for_req(nearby_airports, airports)
-                elif rd_num < 2/3.0:
-                    arr, dep = pick_2_random_airports_for_req(nearby_airports, airports)
-                else:
-                    dep, arr = random.sample(nearby_airports,2)
-                    
-
-        else:
-            # Random region (low density or 10% random in high density)
-            arr, dep = pick_2_random_airports_for_req(airports, airports)
-
-        '''Season conflict with geo density, skip for now, fix in future version
-        # === choose arrival airport with seasonal bias ===
-        if season in ["winter", "fall"]:
-            if random.random() < prob_south_bias and south_airports:  # 30% chance to go south
-                candidate_pool = [a for a in south_airports if a in airports and a != dep]
-            else:  # 70% random
-                candidate_pool = [a for a in airports if a != dep]
-        else:  # spring/summer
-            if random.random() < prob_north_bias and north_airports:  # 30% chance to go north
-                candidate_pool = [a for a in north_airports if a in airports and a != dep]
-            else:
-                candidate_pool = [a for a in airports if a != dep]
-
-        if not candidate_pool:
-            candidate_pool = [a for a in airports if a != dep]
-
-        arr = random.choice(candidate_pool)'''
-
-        req_time = start_time + timedelta(minutes=random.randint(0, time_window_days * 24 * 60))
-        req_id = flightID_start + rid
-        jet_type = random.choice(allowed_tailtypes)["AircraftTypeName"]
-
-        # AllowedTailTypes
-        if substitutes == 0:
-            allowed_types = [{"AircraftTypeName": jet_type, "Penalty": 0}]
-        else:
-            other_types = [t for t in allowed_tailtypes if t["AircraftTypeName"] != jet_type]
-            sampled_types = random.sample(other_types, 4)
-            allowed_types = [{"AircraftTypeName": jet_type, "Penalty": 0}] + sampled_types
-
-        # === Required FA crewmember positions ===
-        big_planes = ["CL-650S", "GL5500", "CE-700", "GL6000S", "CE-680AS"]
-
-        # base crew positions (always PIC + SIC)
-        crewmember_req = [
-            {"PositionInCrew": "PIC", "CrewmemberRequiredProperties": [], "CrewmemberRestrictedProperties": []},
-            {"PositionInCrew": "SIC", "CrewmemberRequiredProperties": [], "CrewmemberRestrictedProperties": []},
-        ]
-
-        # # 20% chance to add FA if jet is a big plane
-        # if jet_type in big_planes and random.random() < 0.2:
-        #     crewmember_req.append(
-        #         {"PositionInCrew": "FA", "CrewmemberRequiredProperties": [], "CrewmemberRestrictedProperties": []},
-        #     )
-
-        # === consruct request ===  
-        req = {
-            "RequestID": req_id,
-            "ArrivalAirport": arr,
-            "DepartureAirport": dep,
-            "ActivityType": "OPERATE_REVENUE_FLIGHT",
-            "RequestedTime": req_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "RequiredCrewmemberPositions": crewmember_req,
-            "AllowedTailTypes": allowed_types,
-            "requestedAircraftTypeName": jet_type,
-            "TailRequiredProperties": []
-        }
-        requests.append(req)
-        base_dep_counter[dep] += 1
+    if not chunked:
+        flight_requests = generate_flight_requests(num_requests, flightID_start, num_hub_reqs, airports, nearby_airports,
+                                                   allowed_tailtypes, geo_density, hub_pattern, substitutes,
+                                                   start_time, time_window_days * 24 * 60)
+    else:
+        flight_requests = [r for chunk in request_chunks for r in chunk]
+    requests.extend(flight_requests)
+    for req in flight_requests:
+        base_dep_counter[req["DepartureAirport"]] += 1
+        summary.add_request(req)
+        if sharder is not None:
+            sharder.add("FlightRequests", req)
 
 
 
     # === generate mx requests ===
-    for mx_id in range(int(mx_num)):
-        dep = random.choice(mx_airport)
-        arr = dep
-        req_time = start_time + timedelta(minutes=random.randint(0, time_window_days * 24 * 60))
-        service_time = random.randint(4, 24)*60  # maintenance time between 4 hours to 24 hours
-        req_id = mxID_start + mx_id
-        required_tail_obj = random.choice(tails)
-        required_tail = required_tail_obj["TailNumber"]
-        jet_type = required_tail_obj["AircraftTypeName"]
-
-        requests.append({
-            "RequestID": req_id,
-            "RequiredTail": required_tail,
-            "ArrivalAirport": arr,
-            "DepartureAirport": dep,
-            "ActivityType": "MAINTENANCE",
-            "RequestedTime": req_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "ServiceTime": service_time,
-            "AllowedTailTypes": [{"AircraftTypeName": jet_type, "Penalty": 0}],
-            "requestedAircraftTypeName": jet_type,
-            "TailRequiredProperties": []
-        })
+    if not chunked:
+        mx_requests = generate_mx_requests(int(mx_num), mxID_start, mx_airport, tails, availability,
+                                           start_time, time_window_days * 24 * 60)
+    else:
+        # batches own disjoint tails, so their availability checks never conflict
+        mx_base, _ = _request_id_bases(time_window_days)
+        mx_counts = [int(mx_num) // MX_BATCHES + (b < int(mx_num) % MX_BATCHES) for b in range(MX_BATCHES)]
+        mx_args = []
+        for b in range(MX_BATCHES):
+            batch_tails = tails[b::MX_BATCHES]
+            batch_tail_ids = {t["TailNumber"] for t in batch_tails}
+            mx_args.append((seed, b, mx_base, mx_counts[b], mx_airport, batch_tails,
+                            [l for l in legs if l["TailNumber"] in batch_tail_ids],
+                            start_time, time_window_days * 24 * 60))
+        with _chunk_pool(workers) as pool:
+            mx_requests = [r for chunk in _chunk_results(_submit_chunks(pool, _mx_chunk, mx_args)) for r in chunk]
+        for req in mx_requests:
+            availability.add_maintenance(req)
+    for req in mx_requests:
+        requests.append(req)
+        summary.add_request(req, "MaintenanceRequests")
+        if sharder is not None:
+            sharder.add("FlightRequests", req)
 
 
 
@@ -897,6 +1183,8 @@ def generate_scenario(
     extra_requests = []
     if event:
         epicenter_event = random.choice(airports)
+        # chunked runs: keep clear of the per-day request and maintenance ID blocks
+        event_id_start = flightID_start + len(requests) if not chunked else _request_id_bases(time_window_days)[1]
         event_airports = airports_inside_circle(epicenter_event, 30.0, airport_coords)
         print(f"🎪 Event at {epicenter_event}: {len(event_airports)} airports within 30mi have surge demand")
 
@@ -907,7 +1195,7 @@ def generate_scenario(
                 dep = ea
                 arr = random.choice([a for a in airports if a != dep])
                 req_time = start_time + timedelta(minutes=random.randint(0, time_window_days * 24 * 60))
-                req_id = flightID_start + len(requests)
+                req_id = event_id_start + len(requests) - baseline_count
                 jet_type = random.choice(allowed_tailtypes)["AircraftTypeName"]
 
                 requests.append({
@@ -921,11 +1209,15 @@ def generate_scenario(
                     "AllowedTailTypes": [{"AircraftTypeName": jet_type, "Penalty": 0}],
                     "requestedAircraftTypeName": jet_type,
                 })
+                summary.add_request(requests[-1], "EventRequests")
+                if sharder is not None:
+                    sharder.add("FlightRequests", requests[-1])
 
         extra_count = len(event_airports) * 10
         # extra_count = len(extra_requests)
         # requests += extra_requests                 
         print(f"📈 Event extra requests: {extra_count}")
+        summary.set_event(epicenter_event, event_airports, extra_count)
 
 
 
@@ -937,7 +1229,7 @@ def generate_scenario(
         print(f"🌩️ Weather at {epicenter} (US only): shutdown {len(weather_affected_airports)} airports within 30mi, affecting {len(affected_tails)} tails")
 
         # 4. generate locked legs for the affected tails (grounded for the entire planning window)
-        starting_leg_id=legID_start + len(legs)
+        starting_leg_id=legID_start + (len(legs) if not chunked else len(crew_args) * LEG_ID_BLOCK)
         weather_legs = build_grounding_legs_for_tails(
             tails=tails,
             affected_airports=weather_affected_airports,
@@ -945,6 +1237,8 @@ def generate_scenario(
             time_window_days=time_window_days,
             starting_leg_id=starting_leg_id
         )
+        summary.set_weather(epicenter, weather_affected_airports, len(affected_tails), weather_legs)
+        availability.add_legs(weather_legs)
     else:
         weather_legs = []
 
@@ -991,9 +1285,42 @@ def generate_scenario(
         "Description": "DOE Run #11 with Weather disruption",
     }
 
-    filename = f"scenario_{arrival_rate}_{geo_density}_{tail_scale}_{maintenance_cycle}.json"
+    if weather:
+        summary.add_many("Legs", legs)
+    summary.base_departures = base_dep_counter
+    sidecars = [summary.write(filename)]
+    if eligibility_index and crew_included:
+        sidecars.append(write_eligibility_index(qual_index.eligibility_index(requests), filename))
+    if hardness:
+        metrics = analyze_scenario(scenario, all_airport_coords, HARDNESS_RADIUS_MILES, route_table)
+        sidecars.append(write_hardness(metrics, filename))
+    if sharder is not None:
+        if weather:
+            sharder.add_many("Legs", legs)
+        shard_dir = filename[:-len(".json")] + "_shards"
+        manifest = sharder.write(shard_dir, extra={"Weather": scenario["Weather"],
+                                                   "Description": scenario["Description"]})
+        print()
+        print(f"✅ {shard_dir}/ generated with {len(manifest['Shards'])} shards of {shard_hours}h, "
+              f"{len(requests)} requests and {len(tails)} tails")
+        return
+
+    def _written(path):
+        if store_key is not None:
+            store.put(store_key, [path] + sidecars, factors=factors, seed=seed)
+
+    if writer is not None:
+        def _on_done(path):
+            print(f"💾 {path} written")
+            _written(path)
+        writer.submit(scenario, filename, on_done=_on_done)
+        print()
+        print(f"✅ {filename} generated with {len(requests)} requests and {len(tails)} tails (queued for writing)")
+        return
+
     with open(filename, "w") as f:
         json.dump(scenario, f, indent=2)
+    _written(filename)
     print()
     print(f"✅ {filename} generated with {len(requests)} requests and {len(tails)} tails")
 
@@ -1011,10 +1338,43 @@ def generate_scenario(
 #     generate_scenario11_full(exp.values())
 # === Generate multiple scenarios ===
 experiments = [
-    {"arrival_rate": "low", "substitutes": 0, "tail_scale": "low", "geo_density": "high", "hub_pattern": "fly_out", "time_window_days": 1, "weather": True, "event": False, "maintenance_cycle": "low"},
-    {"arrival_rate": "high", "substitutes": 1, "tail_scale": "high", "geo_density": "low", "hub_pattern": "fly_in", "time_window_days": 1, "weather": False, "event": True, "maintenance_cycle": "high"},
+    {"arrival_rate": "low", "substitutes": 0, "tail_scale": "low", "geo_density": "high", "hub_pattern": "fly_out", "time_window_days": 1, "weather": True, "event": False, "maintenance_cycle": "low", "seed": 1},
+    {"arrival_rate": "high", "substitutes": 1, "tail_scale": "high", "geo_density": "low", "hub_pattern": "fly_in", "time_window_days": 1, "weather": False, "event": True, "maintenance_cycle": "high", "seed": 2},
 ]
 
-for exp in experiments:
-    generate_scenario(**exp)
-    print("--------------------------------------------------")
\ No newline at end of file
+def smoke_check():
+    """
+    python test_doe.py --smoke, in a temp dir: a chunked run with the eligibility
+    sidecar, and the same seed serially / with 1 / with 2 workers must give the same scenario.
+    """
+    import tempfile
+    from scenario_diff import diff_scenarios, is_identical
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            outputs = []
+            for i, workers in enumerate((None, 1, 2)):
+                generate_scenario(seed=7, workers=workers, eligibility_index=workers == 1)
+                filename, = [f for f in os.listdir(".") if f.startswith("scenario_") and f.count(".") == 1]
+                os.replace(filename, f"run{i}.json")
+                outputs.append(f"run{i}.json")
+            for other in outputs[1:]:
+                assert is_identical(diff_scenarios(outputs[0], other)), f"{outputs[0]} != {other}"
+            print("✅ smoke check passed")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":      # worker processes re-import this file
+    import sys
+    if "--smoke" in sys.argv:
+        smoke_check()
+        sys.exit(0)
+    # serialization of cell i overlaps generation of cell i+1;
+    # cells already in the store (same factors, seed, code and srd.json) are restored, not regenerated
+    store = ScenarioStore("scenario_store", max_bytes=STORE_MAX_BYTES)
+    with ScenarioWriter(max_workers=2) as writer:
+        for exp in experiments:
+            generate_scenario(**exp, writer=writer, store=store, hardness=True)
+            print("--------------------------------------------------")
\ No newline at end of file